@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+
 import streamlit as st
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import QueuePool
@@ -356,31 +358,34 @@ def audit_database():
     return results
 
 
+_STATUS_BADGES = {
+    "new_lead": "NEW",
+    "New": "NEW",
+    "info_gathering": "INFO",
+    "Block A": "A",
+    "design": "DES",
+    "Block B": "B",
+    "pricing": "PRC",
+    "Block C": "C",
+    "proposal_sent": "SENT",
+    "Block D": "D",
+    "in_production": "PROD",
+    "ACTIVE PRODUCTION": "PROD",
+    "completed": "DONE",
+    "invoiced": "INV",
+    "on_hold": "HOLD",
+    "permit_pending": "PRMT",
+    "Archived": "ARCH",
+    "archived": "ARCH",
+    "Closed - Won": "WON",
+    "Closed - Lost": "LOST"
+}
+
+
+@lru_cache(maxsize=64)
 def get_status_badge(status: str) -> str:
     """Return status badge based on project status - text labels, no emojis."""
-    status_map = {
-        "new_lead": "NEW",
-        "New": "NEW",
-        "info_gathering": "INFO",
-        "Block A": "A",
-        "design": "DES",
-        "Block B": "B",
-        "pricing": "PRC",
-        "Block C": "C",
-        "proposal_sent": "SENT",
-        "Block D": "D",
-        "in_production": "PROD",
-        "ACTIVE PRODUCTION": "PROD",
-        "completed": "DONE",
-        "invoiced": "INV",
-        "on_hold": "HOLD",
-        "permit_pending": "PRMT",
-        "Archived": "ARCH",
-        "archived": "ARCH",
-        "Closed - Won": "WON",
-        "Closed - Lost": "LOST"
-    }
-    return status_map.get(status, status[:4].upper() if status else "---")
+    return _STATUS_BADGES.get(status, status[:4].upper() if status else "---")
 
 
 def get_project_by_id(project_id: str):
@@ -408,6 +413,63 @@ def get_project_by_id(project_id: str):
     return results[0] if results else None
 
 
+def get_project_bundle(project_id: str, history_limit: int = 15):
+    """Fetch a project and its recent touch history in one round-trip.
+
+    The touches ride along as a json_agg subquery so the detail view does
+    not pay a second query for the history panel. Returns
+    {"project": row_or_None, "touches": list}."""
+    from datetime import datetime
+    
+    query = """
+        SELECT p.id, p.client_name, p.status, p.notes, p.estimated_value, 
+               p.source, p.last_touched, p.is_parked, p.google_drive_link,
+               p.google_drive_folder_id, p.logo_url, p.created_at, p.updated_at,
+               p.date_applied, p.permit_number, p.permit_office_phone, p.site_address,
+               p.design_proof_drive_id, p.design_proof_name, p.proposal_drive_id, p.proposal_name,
+               COALESCE(p.no_design_required, FALSE) as no_design_required,
+               COALESCE(p.deposit_invoice_requested, FALSE) as deposit_invoice_requested,
+               COALESCE(p.deposit_invoice_sent, FALSE) as deposit_invoice_sent,
+               p.deposit_received_date, p.deposit_amount, p.value_source,
+               COALESCE(p.pending_action, FALSE) as pending_action, p.action_note, p.action_due_date,
+               p.primary_contact_name, p.primary_contact_phone, p.primary_contact_email,
+               p.secondary_contact_name, p.secondary_contact_phone, p.secondary_contact_email,
+               p.master_spec_file_id, p.master_spec_file_name, p.master_spec_locked_at,
+               COALESCE(p.production_locked, FALSE) as production_locked,
+               p.signed_spec_file_id, p.signed_spec_file_name,
+               (
+                   SELECT COALESCE(json_agg(t), '[]'::json)
+                   FROM (
+                       SELECT id, touch_type, note, touched_at
+                       FROM project_touches
+                       WHERE project_id = p.id
+                       ORDER BY touched_at DESC
+                       LIMIT :history_limit
+                   ) t
+               ) AS recent_touches
+        FROM projects p
+        WHERE p.id = :project_id AND p.tenant_id = :tenant_id
+    """
+    results = execute_query(query, {
+        "project_id": project_id,
+        "tenant_id": TENANT_ID,
+        "history_limit": history_limit
+    })
+    if not results:
+        return {"project": None, "touches": []}
+    
+    project = results[0]
+    touches = project.pop("recent_touches", None) or []
+    for touch in touches:
+        touched_at = touch.get("touched_at")
+        if isinstance(touched_at, str):
+            try:
+                touch["touched_at"] = datetime.fromisoformat(touched_at)
+            except ValueError:
+                touch["touched_at"] = None
+    return {"project": project, "touches": touches}
+
+
 def update_project_identity(project_id: str, client_name: str, site_address: str,
                            primary_contact_name: str, primary_contact_phone: str, primary_contact_email: str,
                            secondary_contact_name: str, secondary_contact_phone: str, secondary_contact_email: str) -> bool:
@@ -1075,6 +1137,38 @@ def update_project_ledger(project_id: str, commission_rate: float, paid_status:
         })
 
 
+def update_project_ledgers(changes: list) -> bool:
+    """Batch-update commission rates for multiple projects in one transaction.
+    changes is an iterable of (project_id, commission_rate) tuples."""
+    params = [
+        {"project_id": project_id, "commission_rate": commission_rate, "tenant_id": TENANT_ID}
+        for project_id, commission_rate in changes
+    ]
+    if not params:
+        return True
+
+    engine = get_engine()
+    if engine is None:
+        return False
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(
+                text("""
+                    UPDATE projects
+                    SET commission_rate = :commission_rate,
+                        updated_at = NOW()
+                    WHERE id = :project_id AND tenant_id = :tenant_id
+                """),
+                params
+            )
+            conn.commit()
+        return True
+    except SQLAlchemyError as e:
+        st.error(f"Update error: {str(e)}")
+        return False
+
+
 def save_project_photo(project_id: str, filename: str, file_data: bytes, photo_type: str = "markup") -> bool:
     """Save a photo to the project_photos table."""
     engine = get_engine()
@@ -1112,6 +1206,40 @@ def save_project_photo(project_id: str, filename: str, file_data: bytes, photo_t
         return False
 
 
+def save_project_photos(project_id: str, photos: list) -> int:
+    """Save a batch of photos in one transaction.
+
+    photos is a list of (filename, file_data, photo_type) tuples. A single
+    executemany INSERT with one commit replaces per-file round-trips and
+    fsyncs; batch filenames are freshly generated so the upsert check in
+    save_project_photo is not needed. Returns the number of rows saved.
+    """
+    if not photos:
+        return 0
+    
+    engine = get_engine()
+    if engine is None:
+        return 0
+    
+    try:
+        with engine.connect() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO project_photos (project_id, filename, file_data, photo_type)
+                    VALUES (:project_id, :filename, :file_data, :photo_type)
+                """),
+                [
+                    {"project_id": project_id, "filename": filename, "file_data": file_data, "photo_type": photo_type}
+                    for filename, file_data, photo_type in photos
+                ]
+            )
+            conn.commit()
+        return len(photos)
+    except SQLAlchemyError as e:
+        st.error(f"Photo batch save error: {str(e)}")
+        return 0
+
+
 def get_project_photos(project_id: str, photo_type: str = None) -> list:
     """Fetch photos for a project. Returns list of dicts with id, filename, file_data, photo_type."""
     engine = get_engine()
@@ -0,0 +1,224 @@
+import json
+
+import streamlit as st
+import streamlit.components.v1 as components
+from datetime import datetime
+from streamlit_js_eval import streamlit_js_eval
+from services.database_manager import add_lead_note, update_lead_status
+from services.email_service import send_email
+
+
+@st.dialog("📧 Draft Email", width="large")
+def render_lead_email_dialog(lead: dict):
+    """Render email composition dialog for a lead."""
+    lead_id = str(lead.get("id", ""))
+    lead_name = lead.get("name") or "there"
+    lead_email = lead.get("email") or ""
+    
+    to_key = f"lead_email_to_{lead_id}"
+    subject_key = f"lead_email_subject_{lead_id}"
+    body_key = f"lead_email_body_{lead_id}"
+    
+    if to_key not in st.session_state:
+        st.session_state[to_key] = lead_email
+    if subject_key not in st.session_state:
+        st.session_state[subject_key] = f"KB Signs - Your Sign Project Inquiry"
+    if body_key not in st.session_state:
+        st.session_state[body_key] = f"""Hi {lead_name},
+
+Thank you for reaching out to KB Signs! I'm excited to discuss your signage needs.
+
+I'd love to learn more about your project. Could you share a few details?
+- What type of sign are you looking for?
+- Where will it be installed?
+- Do you have a timeline in mind?
+
+I'm available for a call whenever works best for you. Looking forward to connecting!
+
+Best regards,
+Kam Gray
+KB Signs
+(916) 832-6606"""
+    
+    to_address = st.text_input("To:", value=st.session_state[to_key], key=f"{to_key}_input")
+    subject = st.text_input("Subject:", value=st.session_state[subject_key], key=f"{subject_key}_input")
+    
+    col_body, col_mic = st.columns([10, 1])
+    with col_body:
+        body = st.text_area("Message:", value=st.session_state[body_key], key=f"{body_key}_input", height=250)
+    with col_mic:
+        st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
+        render_voice_button(lead_id, f"{body_key}_input", "lead_email")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("🚀 Send Email", type="primary", use_container_width=True):
+            if to_address and subject and body:
+                success = send_email(to_address, subject, body)
+                if success:
+                    update_lead_status(lead_id, "Block A")
+                    add_lead_note(lead_id, f"Sent outreach email: {subject}")
+                    st.toast("✅ Email sent! → Block A", icon="📧")
+                    st.session_state[f"show_lead_email_dialog_{lead_id}"] = False
+                    del st.session_state[to_key]
+                    del st.session_state[subject_key]
+                    del st.session_state[body_key]
+                    st.rerun()
+                else:
+                    st.error("Failed to send email")
+            else:
+                st.warning("Please fill in all fields")
+    
+    with col2:
+        if st.button("Cancel", use_container_width=True):
+            st.session_state[f"show_lead_email_dialog_{lead_id}"] = False
+            st.rerun()
+
+
+@st.dialog("💬 Draft Text", width="large")
+def render_lead_text_dialog(lead: dict):
+    """Render text message composition dialog for a lead."""
+    lead_id = str(lead.get("id", ""))
+    lead_name = lead.get("name") or "there"
+    lead_phone = lead.get("phone") or ""
+    
+    body_key = f"lead_text_body_{lead_id}"
+    
+    if body_key not in st.session_state:
+        st.session_state[body_key] = f"Hi {lead_name}! This is Kam from KB Signs. Thanks for reaching out about your sign project! When would be a good time to chat? - Kam"
+    
+    st.markdown(f"**To:** {lead_phone or 'No phone number'}")
+    
+    col_body, col_mic = st.columns([10, 1])
+    with col_body:
+        body = st.text_area("Message:", value=st.session_state[body_key], key=f"{body_key}_input", height=150)
+    with col_mic:
+        st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
+        render_voice_button(lead_id, f"{body_key}_input", "lead_text")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("✅ Mark Text Sent", type="primary", use_container_width=True):
+            update_lead_status(lead_id, "Block A")
+            body_preview = (body[:100] + "...") if body and len(body) > 100 else (body or "")
+            add_lead_note(lead_id, f"Sent text message: {body_preview}")
+            st.toast("✅ Text sent! → Block A", icon="💬")
+            st.session_state[f"show_lead_text_dialog_{lead_id}"] = False
+            del st.session_state[body_key]
+            st.rerun()
+    
+    with col2:
+        if st.button("Cancel", use_container_width=True):
+            st.session_state[f"show_lead_text_dialog_{lead_id}"] = False
+            st.rerun()
+
+
+def render_voice_button(lead_id: str, target_key: str, dialog_type: str):
+    """Render voice dictation button for lead dialogs."""
+    voice_key = f"voice_{dialog_type}_{lead_id}"
+    recording_key = f"recording_{dialog_type}_{lead_id}"
+    result_key = f"voice_result_{dialog_type}_{lead_id}"
+    error_key = f"voice_error_{dialog_type}_{lead_id}"
+    shutdown_key = f"voice_shutdown_{dialog_type}_{lead_id}"
+    
+    if result_key in st.session_state and st.session_state[result_key]:
+        result = st.session_state[result_key]
+        st.session_state[result_key] = None
+        st.session_state[recording_key] = False
+        
+        current = st.session_state.get(target_key, "")
+        if current:
+            st.session_state[target_key] = current + " " + result
+        else:
+            st.session_state[target_key] = result
+        
+        st.toast(f"✅ Added: {result}", icon="🎤")
+        st.rerun()
+    
+    if error_key in st.session_state and st.session_state[error_key]:
+        error = st.session_state[error_key]
+        st.session_state[error_key] = None
+        st.session_state[recording_key] = False
+        st.error(f"🎤 Voice error: {error}")
+    
+    is_recording = st.session_state.get(recording_key, False)
+    
+    if is_recording:
+        if st.button("🔴", key=f"{voice_key}_stop", help="Click to cancel"):
+            st.session_state[recording_key] = False
+            st.session_state[shutdown_key] = True
+            st.rerun()
+
+        components.html(f"""
+        <style>
+            @keyframes pulse {{ 0%,100% {{ opacity:1; }} 50% {{ opacity:0.5; }} }}
+            .rec {{ color:#e74c3c; animation:pulse 1s infinite; font-size:12px; }}
+        </style>
+        <div class="rec">🔴 Recording...</div>
+        <script>
+        (function() {{
+            if (sessionStorage.getItem('vd_started_{voice_key}')) return;
+            const SR = window.SpeechRecognition || window.webkitSpeechRecognition;
+            if (!SR) {{ sessionStorage.setItem('vd_error_{voice_key}','not_supported'); return; }}
+            sessionStorage.setItem('vd_started_{voice_key}', 'true');
+            const r = new SR();
+            r.lang = 'en-US';
+            r.interimResults = false;
+            r.onresult = (e) => {{ sessionStorage.setItem('vd_result_{voice_key}', e.results[0][0].transcript); }};
+            r.onerror = (e) => {{ sessionStorage.setItem('vd_error_{voice_key}', e.error); }};
+            r.onend = () => {{ sessionStorage.setItem('vd_ended_{voice_key}', 'true'); sessionStorage.removeItem('vd_started_{voice_key}'); }};
+            window['__vd_{voice_key}'] = r;
+            try {{ r.start(); }} catch(e) {{}}
+        }})();
+        </script>
+        """, height=30)
+        
+        try:
+            poll_result = streamlit_js_eval(
+                js_expressions=f"""
+                (function() {{
+                    const r = sessionStorage.getItem('vd_result_{voice_key}');
+                    const e = sessionStorage.getItem('vd_error_{voice_key}');
+                    const ended = sessionStorage.getItem('vd_ended_{voice_key}');
+                    if (r) {{ sessionStorage.removeItem('vd_result_{voice_key}'); sessionStorage.removeItem('vd_ended_{voice_key}'); return JSON.stringify({{type:'result',value:r}}); }}
+                    if (e) {{ sessionStorage.removeItem('vd_error_{voice_key}'); sessionStorage.removeItem('vd_ended_{voice_key}'); return JSON.stringify({{type:'error',value:e}}); }}
+                    if (ended === 'true') {{ sessionStorage.removeItem('vd_ended_{voice_key}'); return JSON.stringify({{type:'no_result'}}); }}
+                    return null;
+                }})()
+                """,
+                key=f"poll_{voice_key}_{datetime.now().timestamp()}"
+            )
+            
+            if poll_result:
+                data = json.loads(poll_result)
+                if data.get('type') == 'result':
+                    st.session_state[result_key] = data['value']
+                    st.session_state[recording_key] = False
+                    st.rerun()
+                elif data.get('type') == 'error':
+                    st.session_state[error_key] = data['value']
+                    st.session_state[recording_key] = False
+                    st.rerun()
+                elif data.get('type') == 'no_result':
+                    st.session_state[recording_key] = False
+                    st.warning("No speech detected.")
+                    st.rerun()
+        except Exception as e:
+            print(f"[VoiceDictation] Poll error: {e}")
+    else:
+        if st.session_state.pop(shutdown_key, False):
+            components.html(f"""
+            <script>
+            (function() {{
+                const r = window['__vd_{voice_key}'];
+                if (r) {{ try {{ r.stop(); }} catch(e) {{}} delete window['__vd_{voice_key}']; }}
+                sessionStorage.removeItem('vd_started_{voice_key}');
+            }})();
+            </script>
+            """, height=0)
+
+        if st.button("🎙️", key=f"{voice_key}_start", help="Voice dictation"):
+            st.session_state[recording_key] = True
+            st.rerun()
@@ -1,54 +1,127 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from calendar import monthrange
-from services.database_manager import get_paid_commissions_for_ledger, get_all_projects_for_ledger, update_project_ledger
+from operator import itemgetter
+from services.database_manager import get_paid_commissions_for_ledger, get_all_projects_for_ledger, update_project_ledgers
 from services.email_service import send_commission_report_email
 from services.timezone_utils import today_mountain, now_mountain
 
 
+# Constant period metadata, indexed by 0 for period 1 (day <= 15) and 1 for
+# period 2, so hot loops do a tuple lookup instead of rebuilding the strings.
+_PERIOD_INFO = (
+    (1, "1st - 15th", "Paid on the 20th", "Submission Due: 16th"),
+    (2, "16th - End of Month", "Paid on the 5th", "Submission Due: 1st"),
+)
+
+# Static HTML blocks built once at import instead of per rerun.
+_HTML_ALERT_TEMPLATE = """
+    <div style="
+        background: linear-gradient(145deg, #FF6B35 0%, #D4380D 100%);
+        border-radius: 12px;
+        padding: 16px 20px;
+        margin-bottom: 20px;
+        border: 2px solid #FF6B35;
+    ">
+        <p style="color: white; font-size: 16px; font-weight: 600; margin: 0;">
+            {msg}
+        </p>
+    </div>
+    """
+
+_HTML_HOW_COMMISSIONS = """
+    <div style="background: rgba(0, 168, 232, 0.1); border-radius: 12px; padding: 16px; margin-top: 16px;">
+        <h5 style="color: #00A8E8; margin: 0 0 8px 0;">How Commissions Are Tracked</h5>
+        <ul style="color: #E5E5E5; font-size: 13px; margin: 0; padding-left: 20px;">
+            <li><strong>Deposit Received</strong> - When you confirm deposit in Block D (Deposit & Handoff)</li>
+            <li><strong>Final Payment</strong> - When you close a project in Block G (Project Closeout)</li>
+        </ul>
+    </div>
+    """
+
+_HTML_PAY_SCHEDULE = """
+    <div style="
+        background: linear-gradient(145deg, #1a2a3a 0%, #0d1b2a 100%);
+        border-radius: 16px;
+        padding: 20px;
+        margin-top: 16px;
+        border: 1px solid #00A8E8;
+    ">
+        <h4 style="color: #00A8E8; margin: 0 0 12px 0;">Pay Schedule Reminder</h4>
+        <div style="
+            background: rgba(255, 184, 0, 0.1);
+            border-radius: 8px;
+            padding: 12px;
+        ">
+            <div style="color: #E5E5E5; font-size: 13px;">
+                <div style="margin-bottom: 6px;">
+                    <strong>Period 1 (1st - 15th)</strong>: Submit by 16th - Paid on 20th
+                </div>
+                <div>
+                    <strong>Period 2 (16th - EOM)</strong>: Submit by 1st - Paid on 5th
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+
+
+@st.cache_data(ttl=60)
+def _cached_paid_commissions():
+    """Cached ledger commissions so widget-driven reruns skip the DB round-trip."""
+    return get_paid_commissions_for_ledger()
+
+
+@st.cache_data(ttl=60)
+def _cached_ledger_projects():
+    """Cached ledger projects; cleared explicitly after rate edits."""
+    return get_all_projects_for_ledger()
+
+
 def get_pay_period_info(payment_date):
     """Determine pay period from payment date.
     Period 1: 1st-15th (paid on 20th, submission due 16th)
     Period 2: 16th-EOM (paid on 5th of next month, submission due 1st)
     """
     if isinstance(payment_date, str):
-        payment_date = datetime.strptime(payment_date, "%Y-%m-%d").date()
-    
-    day = payment_date.day
-    if day <= 15:
-        return 1, "1st - 15th", "Paid on the 20th", "Submission Due: 16th"
-    else:
-        return 2, "16th - End of Month", "Paid on the 5th", "Submission Due: 1st"
+        payment_date = date.fromisoformat(payment_date)
+
+    return _PERIOD_INFO[0 if payment_date.day <= 15 else 1]
 
 
-def get_deadline_alert():
+def get_deadline_alert(today=None):
     """Check if today is a submission deadline day (in Mountain Time)."""
-    today = today_mountain()
+    if today is None:
+        today = today_mountain()
     day = today.day
     month_name = today.strftime("%B %Y")
     
     if day == 16:
         return True, f"Period 1 Complete ({month_name}). Review and send commission report to Bruno today."
     elif day == 1:
-        prev_month = (today.replace(day=1) - pd.Timedelta(days=1))
+        prev_month = today.replace(day=1) - timedelta(days=1)
         prev_month_name = prev_month.strftime("%B %Y")
         return True, f"Period 2 Complete ({prev_month_name}). Review and send commission report to Bruno today."
     
     return False, ""
 
 
-def get_current_period():
+def get_current_period(today=None):
     """Get the current pay period (1 or 2) in Mountain Time."""
-    return 1 if today_mountain().day <= 15 else 2
+    if today is None:
+        today = today_mountain()
+    return 1 if today.day <= 15 else 2
 
 
-def get_report_period_info():
+def get_report_period_info(today=None):
     """Get the period info for commission report generation.
     On deadline days (16th or 1st), returns the period that just closed.
     Otherwise returns the current period in progress.
     Uses Mountain Time for date calculations."""
-    today = today_mountain()
+    if today is None:
+        today = today_mountain()
     day = today.day
     
     if day == 16:
@@ -58,7 +131,7 @@ def get_report_period_info():
         date_range = f"{today.strftime('%B %Y')} 1st - 15th"
         start_day, end_day = 1, 15
     elif day == 1:
-        prev_month = today.replace(day=1) - pd.Timedelta(days=1)
+        prev_month = today.replace(day=1) - timedelta(days=1)
         year = prev_month.year
         month = prev_month.month
         period = 2
@@ -81,52 +154,89 @@ def get_report_period_info():
     return year, month, period, date_range, start_day, end_day
 
 
-def get_current_period_date_range():
+def get_current_period_date_range(period_info=None):
     """Get the date range string for the report period."""
-    _, _, _, date_range, _, _ = get_report_period_info()
-    return date_range
+    if period_info is None:
+        period_info = get_report_period_info()
+    return period_info[3]
+
+
+def _normalize_commissions(commissions):
+    """Cast each commission's numeric fields once and precompute the earned
+    commission, so the render and report loops read plain floats instead of
+    re-running float(... or default) on every pass."""
+    normalized = []
+    for comm in commissions:
+        c = dict(comm)
+        payment_amount = float(c.get("payment_amount") or 0)
+        rate = float(c.get("commission_rate") or 10)
+        c["payment_amount"] = payment_amount
+        c["project_value"] = float(c.get("project_value") or 0)
+        c["commission_rate"] = rate
+        c["commission_earned"] = payment_amount * rate / 100
+        normalized.append(c)
+    return normalized
 
 
-def group_commissions_by_period(commissions):
+def build_commissions_df(commissions):
+    """Build a typed DataFrame view of the paid commissions.
+
+    Coerces the numeric fields and parses payment dates in one bulk pass so
+    the summary metrics and period grouping run as pandas column kernels
+    instead of per-row Python loops."""
+    df = pd.DataFrame(commissions)
+    df["payment_amount"] = pd.to_numeric(df["payment_amount"], errors="coerce").fillna(0.0)
+    df["commission_rate"] = pd.to_numeric(df["commission_rate"], errors="coerce").fillna(10.0)
+    df["commission"] = df["payment_amount"] * df["commission_rate"] / 100
+    parsed = pd.to_datetime(df["payment_date"], format="%Y-%m-%d", errors="coerce", cache=True)
+    df["_date"] = parsed
+    df["year"] = parsed.dt.year
+    df["month"] = parsed.dt.month
+    df["day"] = parsed.dt.day
+    df["period_num"] = np.where(parsed.dt.day <= 15, 1, 2)
+    return df
+
+
+def group_commissions_by_period(commissions, df=None):
     """Group commissions by Month and Pay Period."""
+    if df is None:
+        df = build_commissions_df(commissions)
+
     grouped = {}
-    
-    for comm in commissions:
-        payment_date = comm.get("payment_date")
-        if not payment_date:
-            continue
-        
-        if isinstance(payment_date, str):
-            payment_date = datetime.strptime(payment_date, "%Y-%m-%d").date()
-        
-        year = payment_date.year
-        month = payment_date.month
-        month_name = payment_date.strftime("%B %Y")
-        period_num, period_label, paid_on, submission_due = get_pay_period_info(payment_date)
-        
-        key = (year, month, period_num)
-        if key not in grouped:
-            grouped[key] = {
-                "month_name": month_name,
-                "period_num": period_num,
-                "period_label": period_label,
-                "paid_on": paid_on,
-                "submission_due": submission_due,
-                "year": year,
-                "month": month,
-                "commissions": []
-            }
-        
-        grouped[key]["commissions"].append(comm)
-    
-    sorted_keys = sorted(grouped.keys(), reverse=True)
-    return [(key, grouped[key]) for key in sorted_keys]
 
+    valid = df[df["_date"].notna()]
+    for (year, month, period_num), g in valid.groupby(["year", "month", "period_num"], sort=False):
+        first_date = g["_date"].iloc[0].date()
+        key = (int(year), int(month), int(period_num))
+        _, period_label, paid_on, submission_due = _PERIOD_INFO[key[2] - 1]
+        grouped[key] = {
+            "month_name": first_date.strftime("%B %Y"),
+            "period_num": key[2],
+            "period_label": period_label,
+            "paid_on": paid_on,
+            "submission_due": submission_due,
+            "year": key[0],
+            "month": key[1],
+            "period_total": float(g["payment_amount"].sum()),
+            "period_commission": float(g["commission"].sum()),
+            "commissions": [commissions[i] for i in g.index]
+        }
+
+    return sorted(grouped.items(), key=itemgetter(0), reverse=True)
 
-def get_report_period_commissions(commissions):
+
+def get_report_period_commissions(commissions, period_info=None, df=None):
     """Filter commissions for the report period (adjusts for deadline days)."""
-    year, month, period, date_range, start_day, end_day = get_report_period_info()
-    
+    if not commissions:
+        return []
+    if period_info is None:
+        period_info = get_report_period_info()
+    year, month, period, date_range, start_day, end_day = period_info
+
+    if df is not None:
+        mask = (df["year"] == year) & (df["month"] == month) & df["day"].between(start_day, end_day)
+        return [commissions[i] for i in df.index[mask]]
+
     filtered = []
     for comm in commissions:
         payment_date = comm.get("payment_date")
@@ -134,9 +244,9 @@ def get_report_period_commissions(commissions):
             continue
         
         if isinstance(payment_date, str):
-            payment_date = datetime.strptime(payment_date, "%Y-%m-%d").date()
-        
-        if (payment_date.year == year and 
+            payment_date = date.fromisoformat(payment_date)
+
+        if (payment_date.year == year and
             payment_date.month == month and
             start_day <= payment_date.day <= end_day):
             filtered.append(comm)
@@ -150,19 +260,7 @@ def render_ledger():
     
     has_alert, alert_message = get_deadline_alert()
     if has_alert:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(145deg, #FF6B35 0%, #D4380D 100%);
-            border-radius: 12px;
-            padding: 16px 20px;
-            margin-bottom: 20px;
-            border: 2px solid #FF6B35;
-        ">
-            <p style="color: white; font-size: 16px; font-weight: 600; margin: 0;">
-                {alert_message}
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HTML_ALERT_TEMPLATE.format(msg=alert_message), unsafe_allow_html=True)
     
     tab1, tab2 = st.tabs(["Paid Commissions", "All Projects (Edit Rates)"])
     
@@ -180,27 +278,17 @@ def render_paid_commissions_tab():
         unsafe_allow_html=True
     )
     
-    commissions = get_paid_commissions_for_ledger()
+    commissions = _normalize_commissions(_cached_paid_commissions())
     
     if not commissions:
         st.info("No paid commissions yet. Commissions will appear here once deposits or final payments are recorded in the project workflow.")
-        st.markdown("""
-        <div style="background: rgba(0, 168, 232, 0.1); border-radius: 12px; padding: 16px; margin-top: 16px;">
-            <h5 style="color: #00A8E8; margin: 0 0 8px 0;">How Commissions Are Tracked</h5>
-            <ul style="color: #E5E5E5; font-size: 13px; margin: 0; padding-left: 20px;">
-                <li><strong>Deposit Received</strong> - When you confirm deposit in Block D (Deposit & Handoff)</li>
-                <li><strong>Final Payment</strong> - When you close a project in Block G (Project Closeout)</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HTML_HOW_COMMISSIONS, unsafe_allow_html=True)
         return
     
-    total_payments = sum(float(c.get("payment_amount") or 0) for c in commissions)
-    avg_commission_rate = sum(float(c.get("commission_rate") or 10) for c in commissions) / len(commissions) if commissions else 10
-    total_commission = sum(
-        float(c.get("payment_amount") or 0) * float(c.get("commission_rate") or 10) / 100 
-        for c in commissions
-    )
+    df = build_commissions_df(commissions)
+    total_payments = float(df["payment_amount"].sum())
+    avg_commission_rate = float(df["commission_rate"].mean()) if len(df) else 10
+    total_commission = float(df["commission"].sum())
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -212,10 +300,11 @@ def render_paid_commissions_tab():
     
     st.divider()
     
-    report_period_comms = get_report_period_commissions(commissions)
-    date_range = get_current_period_date_range()
-    
     today = today_mountain()
+    period_info = get_report_period_info(today)
+    report_period_comms = get_report_period_commissions(commissions, period_info, df)
+    date_range = period_info[3]
+
     is_deadline_day = today.day == 16 or today.day == 1
     period_label = "Due Period" if is_deadline_day else "Current Period"
     
@@ -243,8 +332,9 @@ def render_paid_commissions_tab():
     st.divider()
     st.markdown("### Payment History by Period")
     
-    grouped = group_commissions_by_period(commissions)
-    
+    grouped = group_commissions_by_period(commissions, df)
+    current_period = get_current_period(today)
+
     for (year, month, period_num), period_data in grouped:
         month_name = period_data["month_name"]
         period_label = period_data["period_label"]
@@ -252,14 +342,10 @@ def render_paid_commissions_tab():
         submission_due = period_data["submission_due"]
         period_commissions = period_data["commissions"]
         
-        period_total = sum(float(c.get("payment_amount") or 0) for c in period_commissions)
-        period_commission = sum(
-            float(c.get("payment_amount") or 0) * float(c.get("commission_rate") or 10) / 100 
-            for c in period_commissions
-        )
+        period_total = period_data["period_total"]
+        period_commission = period_data["period_commission"]
         
-        today = today_mountain()
-        is_current = (year == today.year and month == today.month and period_num == get_current_period())
+        is_current = (year == today.year and month == today.month and period_num == current_period)
         
         with st.expander(f"{month_name} - Period {period_num} ({period_label})", expanded=is_current):
             st.markdown(f"""
@@ -285,20 +371,21 @@ def render_paid_commissions_tab():
             </div>
             """, unsafe_allow_html=True)
             
+            parts = []
             for comm in period_commissions:
                 client = comm.get("client_name", "Unknown")
-                project_value = float(comm.get("project_value") or 0)
-                payment_amount = float(comm.get("payment_amount") or 0)
-                rate = float(comm.get("commission_rate") or 10)
+                project_value = comm["project_value"]
+                payment_amount = comm["payment_amount"]
+                rate = comm["commission_rate"]
                 payment_date = comm.get("payment_date")
                 payment_type = comm.get("payment_type", "deposit")
                 notes = comm.get("commission_notes") or ""
                 
-                commission_earned = payment_amount * rate / 100
+                commission_earned = comm["commission_earned"]
                 type_label = "Final" if payment_type == "final" else "Deposit"
                 type_color = "#4CAF50" if payment_type == "final" else "#00A8E8"
                 
-                st.markdown(f"""
+                parts.append(f"""
                 <div style="
                     background: #0d1b2a;
                     border-radius: 10px;
@@ -336,7 +423,9 @@ def render_paid_commissions_tab():
                     </div>
                     {f'<div style="color: #888; font-size: 11px; font-style: italic; margin-top: 6px;">{notes}</div>' if notes else ''}
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+            
+            st.markdown("".join(parts), unsafe_allow_html=True)
             
             col1, col2 = st.columns([3, 1])
             with col2:
@@ -354,7 +443,7 @@ def render_all_projects_tab():
         unsafe_allow_html=True
     )
     
-    projects = get_all_projects_for_ledger()
+    projects = _cached_ledger_projects()
     
     if not projects:
         st.info("No projects in the ledger yet.")
@@ -405,34 +494,48 @@ def render_all_projects_tab():
     )
     
     if "ledger_editor" in st.session_state:
-        for idx, row in edited_df.iterrows():
-            original_row = display_df.iloc[idx]
-            
-            if row["Commission (%)"] != original_row["Commission (%)"]:
-                success = update_project_ledger(
-                    str(row["ID"]),
-                    float(row["Commission (%)"])
-                )
-                
-                if success:
-                    st.toast(f"Updated {row['Client']}")
+        changed = edited_df["Commission (%)"].to_numpy() != display_df["Commission (%)"].to_numpy()
+        if not changed.any():
+            return
 
+        changes = [
+            (str(edited_df.iloc[i]["ID"]), float(edited_df.iloc[i]["Commission (%)"]))
+            for i in np.flatnonzero(changed)
+        ]
 
-def send_current_period_report(commissions: list, date_range: str):
-    """Generate and send commission report for the current period."""
+        if update_project_ledgers(changes):
+            _cached_ledger_projects.clear()
+            _cached_paid_commissions.clear()
+            _build_report_body.clear()
+            st.toast(f"Updated {len(changes)} project(s)")
+
+
+@st.cache_data(hash_funcs={list: lambda xs: tuple(
+    (c.get("id"), c.get("payment_type"), c.get("payment_amount"), c.get("commission_rate"),
+     c.get("client_name"), c.get("payment_date"), c.get("commission_notes"))
+    for c in xs
+)})
+def _build_report_body(commissions: list, date_range: str) -> str:
+    """Build the textual commission report for a period.
+
+    Cached on every report-visible field of each commission (identity,
+    amounts, client, date, notes) so any edit produces a fresh body; the
+    send timestamp is appended by the caller so repeat sends stay
+    accurate."""
     report_lines = []
     total_payment = 0
     total_commission = 0
     
     for comm in commissions:
-        client = comm.get("client_name", "Unknown")
-        payment_amount = float(comm.get("payment_amount") or 0)
-        rate = float(comm.get("commission_rate") or 10)
-        payment_type = comm.get("payment_type", "deposit")
-        payment_date = comm.get("payment_date")
-        notes = comm.get("commission_notes") or ""
+        get = comm.get
+        client = get("client_name", "Unknown")
+        payment_amount = comm["payment_amount"]
+        rate = comm["commission_rate"]
+        payment_type = get("payment_type", "deposit")
+        payment_date = get("payment_date")
+        notes = get("commission_notes") or ""
         
-        commission_earned = payment_amount * rate / 100
+        commission_earned = comm["commission_earned"]
         type_label = "Final Payment" if payment_type == "final" else "Deposit"
         
         total_payment += payment_amount
@@ -443,7 +546,8 @@ def send_current_period_report(commissions: list, date_range: str):
             line += f"\n  Note: {notes}"
         report_lines.append(line)
     
-    report_body = f"""Commission Report
+    details = "\n".join(report_lines)
+    return f"""Commission Report
 Period: {date_range}
 
 SUMMARY
@@ -454,8 +558,13 @@ Number of Payments: {len(commissions)}
 
 DETAILS
 -------
-{chr(10).join(report_lines)}
+{details}
+"""
 
+
+def send_current_period_report(commissions: list, date_range: str):
+    """Generate and send commission report for the current period."""
+    report_body = _build_report_body(commissions, date_range) + f"""
 ---
 Generated by Grayco Lite V3 on {now_mountain().strftime('%B %d, %Y at %I:%M %p')} (MT)
 """
@@ -485,28 +594,4 @@ def send_period_report(year: int, month: int, period_num: int, commissions: list
 
 def render_pay_schedule_reminder():
     """Render the pay schedule reminder section."""
-    st.markdown("""
-    <div style="
-        background: linear-gradient(145deg, #1a2a3a 0%, #0d1b2a 100%);
-        border-radius: 16px;
-        padding: 20px;
-        margin-top: 16px;
-        border: 1px solid #00A8E8;
-    ">
-        <h4 style="color: #00A8E8; margin: 0 0 12px 0;">Pay Schedule Reminder</h4>
-        <div style="
-            background: rgba(255, 184, 0, 0.1);
-            border-radius: 8px;
-            padding: 12px;
-        ">
-            <div style="color: #E5E5E5; font-size: 13px;">
-                <div style="margin-bottom: 6px;">
-                    <strong>Period 1 (1st - 15th)</strong>: Submit by 16th - Paid on 20th
-                </div>
-                <div>
-                    <strong>Period 2 (16th - EOM)</strong>: Submit by 1st - Paid on 5th
-                </div>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HTML_PAY_SCHEDULE, unsafe_allow_html=True)
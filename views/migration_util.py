@@ -5,9 +5,14 @@ DELETE THIS FILE after migration is complete.
 
 import streamlit as st
 import os
+import pandas as pd
+import re
 import requests
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
+from functools import lru_cache
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from services.timezone_utils import now_mountain
@@ -15,6 +20,68 @@ from services.timezone_utils import now_mountain
 TENANT_ID = "357145e4-b5a1-43e3-a9ba-f8e834b38034"
 SIGN_PROJECTS_FOLDER_ID = "0ALUqW4toI01BUk9PVA"
 
+# Session-scoped cache TTLs for Drive lookups. Streamlit reruns the whole
+# script on every widget click, so without this each redraw re-pays the
+# connector token round-trip and the folder listings.
+_TOKEN_TTL_SECONDS = 50 * 60
+_LISTING_TTL_SECONDS = 60
+
+# Shared HTTP session: keep-alive reuses the TCP+TLS connection across Drive
+# calls, and the explicit gzip markers make Drive compress its JSON responses
+# (requests decodes transparently).
+_session = requests.Session()
+_session.headers.update({
+    "Accept-Encoding": "gzip",
+    "User-Agent": "grayco-lite/1.0 (gzip)"
+})
+# Size the connection pool for concurrent Drive calls so parallel requests
+# reuse warm TLS connections instead of opening new ones per call.
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+
+def _drive_cached(key, ttl, fetch):
+    """Serve (value, err) from st.session_state, refetching after ttl seconds.
+    Only successful results are cached."""
+    cache = st.session_state.setdefault("_drive_cache", {})
+    hit = cache.get(key)
+    now = time.monotonic()
+    if hit and hit[1] > now:
+        return hit[0]
+
+    value, err = fetch()
+    if not err:
+        cache[key] = ((value, err), now + ttl)
+    return value, err
+
+
+def _invalidate_drive_listings(folder_id: str):
+    """Drop cached listings for a folder after a mutation (move/delete/create)."""
+    cache = st.session_state.get("_drive_cache")
+    if not cache:
+        return
+    for key in [
+        k for k in cache
+        if isinstance(k, tuple) and len(k) > 1 and k[1] == folder_id and k[0] != "archive"
+    ]:
+        cache.pop(key, None)
+
+
+@lru_cache(maxsize=4096)
+def _tokens(name: str) -> frozenset:
+    """Tokenize a normalized name once; cached so repeated comparisons against
+    the same folder/project names skip the replace/split/set build."""
+    return frozenset(name.replace('_', ' ').replace('-', ' ').split())
+
+
+def _jaccard(words1: frozenset, words2: frozenset) -> float:
+    """Jaccard similarity of two token sets."""
+    if not words1 or not words2:
+        return 0.0
+    
+    intersection = sum(1 for w in words1 if w in words2)
+    union = len(words1) + len(words2) - intersection
+    return intersection / union if union > 0 else 0.0
+
 
 def fuzzy_match(name1: str, name2: str, threshold: float = 0.7) -> bool:
     """Check if two names have at least threshold% character overlap."""
@@ -30,17 +97,17 @@ def fuzzy_match(name1: str, name2: str, threshold: float = 0.7) -> bool:
     if n1 in n2 or n2 in n1:
         return True
     
-    words1 = set(n1.replace('_', ' ').replace('-', ' ').split())
-    words2 = set(n2.replace('_', ' ').replace('-', ' ').split())
-    
-    if not words1 or not words2:
+    # Token-count ratio is a true upper bound on Jaccard (the intersection
+    # is at most the smaller set, the union at least the larger), so pairs
+    # that can't reach the threshold skip the membership counting.
+    t1 = _tokens(n1)
+    t2 = _tokens(n2)
+    if not t1 or not t2:
+        return False
+    if min(len(t1), len(t2)) / max(len(t1), len(t2)) < threshold:
         return False
     
-    intersection = len(words1 & words2)
-    union = len(words1 | words2)
-    similarity = intersection / union if union > 0 else 0
-    
-    return similarity >= threshold
+    return _jaccard(t1, t2) >= threshold
 
 
 def find_drive_folder_fuzzy(access_token: str, project_name: str) -> tuple:
@@ -49,7 +116,10 @@ def find_drive_folder_fuzzy(access_token: str, project_name: str) -> tuple:
     if err:
         return None, err
     
-    for folder in folders:
+    # Closest-length names are the likeliest matches, so check them first and
+    # stop at the first hit.
+    target_len = len(project_name)
+    for folder in sorted(folders, key=lambda f: abs(len(f.get("name", "")) - target_len)):
         if fuzzy_match(project_name, folder.get("name", ""), threshold=0.7):
             return folder, None
     
@@ -87,29 +157,44 @@ def update_project_drive_folder(project_id: str, folder_id: str, folder_link: st
         return False, str(e)
 
 
+_DRIVE_ID_RE = re.compile(r"(?:folders/|id=|/d/)([a-zA-Z0-9_-]+)")
+
+
 def extract_folder_id_from_url(url: str) -> str:
     """Extract folder ID from a Google Drive URL."""
-    import re
-    
-    patterns = [
-        r'folders/([a-zA-Z0-9_-]+)',
-        r'id=([a-zA-Z0-9_-]+)',
-        r'/d/([a-zA-Z0-9_-]+)'
-    ]
+    if not url:
+        return ""
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _DRIVE_ID_RE.search(url)
+    if match:
+        return match.group(1)
     
-    if len(url) > 20 and '/' not in url and '.' not in url:
+    if len(url) > 20 and not any(c in "/." for c in url):
         return url.strip()
     
     return ""
 
 
+@st.cache_resource
+def _token_holder():
+    """Process-wide token holder so every session shares one connector token."""
+    return {"token": None, "expires_at": 0.0}
+
+
 def get_drive_access_token():
-    """Get Google Drive access token from Replit connector."""
+    """Get Google Drive access token from Replit connector (shared, refreshed ~50 min)."""
+    holder = _token_holder()
+    if time.time() > holder["expires_at"] - 60:
+        token, err = _fetch_drive_access_token()
+        if err:
+            return None, err
+        holder["token"] = token
+        holder["expires_at"] = time.time() + _TOKEN_TTL_SECONDS
+    return holder["token"], None
+
+
+def _fetch_drive_access_token():
+    """Fetch a fresh access token through the Replit connector."""
     hostname = os.environ.get("REPLIT_CONNECTORS_HOSTNAME")
     repl_identity = os.environ.get("REPL_IDENTITY")
     web_repl_renewal = os.environ.get("WEB_REPL_RENEWAL")
@@ -125,7 +210,7 @@ def get_drive_access_token():
         return None, "Connector hostname not found"
     
     try:
-        response = requests.get(
+        response = _session.get(
             f"https://{hostname}/api/v2/connection?include_secrets=true&connector_names=google-drive",
             headers={
                 "Accept": "application/json",
@@ -151,101 +236,135 @@ def get_drive_access_token():
 
 
 def list_drive_folders(access_token: str, parent_folder_id: str):
-    """List folders in a Shared Drive folder."""
+    """List folders in a Shared Drive folder (cached briefly per session)."""
+    return _drive_cached(
+        ("folders", parent_folder_id), _LISTING_TTL_SECONDS,
+        lambda: _fetch_drive_folders(access_token, parent_folder_id)
+    )
+
+
+def _iter_drive_files(access_token: str, query: str, fields: str):
+    """Page through a files.list query with Drive's max page size, following
+    nextPageToken so large Shared Drives are no longer silently truncated."""
     headers = {"Authorization": f"Bearer {access_token}"}
-    
-    query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
-    
-    try:
-        response = requests.get(
+    page_token = None
+    
+    while True:
+        params = {
+            "q": query,
+            "fields": f"nextPageToken,{fields}",
+            "pageSize": 1000,
+            "supportsAllDrives": "true",
+            "includeItemsFromAllDrives": "true",
+            "corpora": "allDrives"
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        
+        response = _session.get(
             "https://www.googleapis.com/drive/v3/files",
             headers=headers,
-            params={
-                "q": query,
-                "fields": "files(id,name,webViewLink)",
-                "pageSize": 100,
-                "supportsAllDrives": "true",
-                "includeItemsFromAllDrives": "true",
-                "corpora": "allDrives"
-            },
+            params=params,
             timeout=15
         )
         data = response.json()
-        return data.get("files", []), None
+        yield from data.get("files", [])
+        
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def _fetch_drive_folders(access_token: str, parent_folder_id: str):
+    query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
+    
+    try:
+        return list(_iter_drive_files(access_token, query, "files(id,name,webViewLink)")), None
     except Exception as e:
         return [], f"Error listing folders: {str(e)}"
 
 
-ALLOWED_IMAGE_MIMES = ["image/jpeg", "image/png", "image/jpg", "image/gif", "image/webp"]
+ALLOWED_IMAGE_MIMES = frozenset({"image/jpeg", "image/png", "image/jpg", "image/gif", "image/webp"})
 
 
-def list_drive_images(access_token: str, folder_id: str):
-    """List image files in a Shared Drive folder, excluding shortcuts, invalid files, and unsupported types."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
+def list_drive_images(access_token: str, folder_id: str, need_thumbnails: bool = True):
+    """List image files in a Shared Drive folder, excluding shortcuts, invalid files, and unsupported types.
+    Pass need_thumbnails=False for callers that only act on file ids, to keep
+    the Drive response to the fields actually read."""
+    return _drive_cached(
+        ("images", folder_id, need_thumbnails), _LISTING_TTL_SECONDS,
+        lambda: _fetch_drive_images(access_token, folder_id, need_thumbnails)
+    )
+
+
+def _fetch_drive_images(access_token: str, folder_id: str, need_thumbnails: bool = True):
     query = f"'{folder_id}' in parents and (mimeType contains 'image/') and trashed=false"
+    fields = (
+        "files(id,name,mimeType,thumbnailLink,webViewLink,size)"
+        if need_thumbnails else "files(id,name,mimeType,size)"
+    )
     
     try:
-        response = requests.get(
-            "https://www.googleapis.com/drive/v3/files",
-            headers=headers,
-            params={
-                "q": query,
-                "fields": "files(id,name,mimeType,thumbnailLink,webViewLink,size)",
-                "pageSize": 50,
-                "supportsAllDrives": "true",
-                "includeItemsFromAllDrives": "true"
-            },
-            timeout=15
-        )
-        data = response.json()
-        files = data.get("files", [])
-        
-        valid_files = []
-        for f in files:
-            mime = f.get("mimeType", "")
-            size = int(f.get("size", 0) or 0)
-            
-            if mime.startswith("application/vnd.google-apps.shortcut"):
-                continue
-            
-            if size == 0:
-                continue
-            
-            if mime not in ALLOWED_IMAGE_MIMES:
-                continue
-            
-            valid_files.append(f)
-        
-        return valid_files, None
+        files = _iter_drive_files(access_token, query, fields)
+        return list(_iter_valid_images(files)), None
     except Exception as e:
         return [], f"Error listing images: {str(e)}"
 
 
-def list_drive_pdfs(access_token: str, folder_id: str):
-    """List PDF files in a Shared Drive folder."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
+def _iter_valid_images(files):
+    """Yield files that are real, non-empty images of a supported type."""
+    for f in files:
+        mime = f.get("mimeType", "")
+        size = int(f.get("size", 0) or 0)
+        
+        if mime.startswith("application/vnd.google-apps.shortcut"):
+            continue
+        
+        if size == 0:
+            continue
+        
+        if mime not in ALLOWED_IMAGE_MIMES:
+            continue
+        
+        yield f
+
+
+def list_drive_pdfs(access_token: str, folder_id: str, page_token: str = None):
+    """List one page of PDF files in a Shared Drive folder (cached briefly).
+
+    Returns ((files, next_page_token), err); pass the token back to fetch
+    the following page."""
+    return _drive_cached(
+        ("pdfs", folder_id, page_token), _LISTING_TTL_SECONDS,
+        lambda: _fetch_drive_pdfs(access_token, folder_id, page_token)
+    )
+
+
+def _fetch_drive_pdfs(access_token: str, folder_id: str, page_token: str = None):
     query = f"'{folder_id}' in parents and mimeType='application/pdf' and trashed=false"
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {
+        "q": query,
+        "fields": "nextPageToken,files(id,name,webViewLink)",
+        "pageSize": 10,
+        "supportsAllDrives": "true",
+        "includeItemsFromAllDrives": "true",
+        "corpora": "allDrives",
+    }
+    if page_token:
+        params["pageToken"] = page_token
     
     try:
-        response = requests.get(
+        response = _session.get(
             "https://www.googleapis.com/drive/v3/files",
             headers=headers,
-            params={
-                "q": query,
-                "fields": "files(id,name,mimeType,webViewLink)",
-                "pageSize": 50,
-                "supportsAllDrives": "true",
-                "includeItemsFromAllDrives": "true",
-                "corpora": "allDrives"
-            },
+            params=params,
             timeout=15
         )
         data = response.json()
-        return data.get("files", []), None
+        return (data.get("files", []), data.get("nextPageToken")), None
     except Exception as e:
-        return [], f"Error listing PDFs: {str(e)}"
+        return ([], None), f"Error listing PDFs: {str(e)}"
 
 
 def create_archive_folder(access_token: str, parent_folder_id: str):
@@ -256,7 +375,7 @@ def create_archive_folder(access_token: str, parent_folder_id: str):
     }
     
     try:
-        response = requests.post(
+        response = _session.post(
             "https://www.googleapis.com/drive/v3/files",
             headers=headers,
             params={
@@ -275,14 +394,29 @@ def create_archive_folder(access_token: str, parent_folder_id: str):
         return None, f"Error creating archive folder: {str(e)}"
 
 
+_ARCHIVE_TTL_SECONDS = 24 * 60 * 60
+
+
 def get_or_create_archive_folder(access_token: str, parent_folder_id: str):
-    """Get existing _ARCHIVE folder or create one in Shared Drive."""
+    """Get existing _ARCHIVE folder or create one in Shared Drive.
+    
+    The archive folder id is stable per parent, so it is cached for a day
+    alongside the listing cache and looked up over the wire at most once.
+    """
+    return _drive_cached(
+        ("archive", parent_folder_id), _ARCHIVE_TTL_SECONDS,
+        lambda: _lookup_or_create_archive_folder(access_token, parent_folder_id)
+    )
+
+
+def _lookup_or_create_archive_folder(access_token: str, parent_folder_id: str):
+    """Resolve the _ARCHIVE folder id via the Drive API, creating it if absent."""
     headers = {"Authorization": f"Bearer {access_token}"}
     
     query = f"'{parent_folder_id}' in parents and name='_ARCHIVE' and mimeType='application/vnd.google-apps.folder' and trashed=false"
     
     try:
-        response = requests.get(
+        response = _session.get(
             "https://www.googleapis.com/drive/v3/files",
             headers=headers,
             params={
@@ -304,12 +438,12 @@ def get_or_create_archive_folder(access_token: str, parent_folder_id: str):
         return None, f"Error checking archive folder: {str(e)}"
 
 
-def move_file_to_archive(access_token: str, file_id: str, current_parent_id: str, archive_folder_id: str):
-    """Move a file to the archive folder in Shared Drive."""
+def _move_file_request(access_token: str, file_id: str, current_parent_id: str, archive_folder_id: str):
+    """Issue the raw Drive move PATCH. Safe to call from worker threads."""
     headers = {"Authorization": f"Bearer {access_token}"}
     
     try:
-        response = requests.patch(
+        response = _session.patch(
             f"https://www.googleapis.com/drive/v3/files/{file_id}",
             headers=headers,
             params={
@@ -324,6 +458,84 @@ def move_file_to_archive(access_token: str, file_id: str, current_parent_id: str
         return False, f"Error moving file: {str(e)}"
 
 
+_BATCH_BOUNDARY = "batch_grayco_drive"
+_BATCH_STATUS_RE = re.compile(r"HTTP/1\.1 (\d{3})")
+
+
+def drive_batch(access_token: str, request_lines: list):
+    """Send up to 100 Drive sub-requests in one multipart/mixed batch call.
+
+    request_lines are raw HTTP request lines such as
+    'PATCH /drive/v3/files/<id>?addParents=X&removeParents=Y HTTP/1.1'.
+    Returns (list_of_status_codes, err)."""
+    parts = []
+    for i, line in enumerate(request_lines):
+        parts.append(
+            f"--{_BATCH_BOUNDARY}\r\n"
+            f"Content-Type: application/http\r\n"
+            f"Content-ID: <item{i}>\r\n\r\n"
+            f"{line}\r\n\r\n"
+        )
+    body = "".join(parts) + f"--{_BATCH_BOUNDARY}--"
+
+    try:
+        response = _session.post(
+            "https://www.googleapis.com/batch/drive/v3",
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": f"multipart/mixed; boundary={_BATCH_BOUNDARY}"
+            },
+            data=body,
+            timeout=30
+        )
+        if response.status_code != 200:
+            return [], f"Batch request failed: {response.status_code}"
+        return [int(code) for code in _BATCH_STATUS_RE.findall(response.text)], None
+    except Exception as e:
+        return [], f"Error in batch request: {str(e)}"
+
+
+def move_file_to_archive(access_token: str, file_id: str, current_parent_id: str, archive_folder_id: str):
+    """Move a file to the archive folder in Shared Drive."""
+    success, err = _move_file_request(access_token, file_id, current_parent_id, archive_folder_id)
+    if success:
+        _invalidate_drive_listings(current_parent_id)
+    return success, err
+
+
+def _queue_drive_move(file_id: str, current_parent_id: str, archive_folder_id: str):
+    """Queue an archive move; queued moves are sent together on the next flush."""
+    ops = st.session_state.setdefault("_pending_drive_ops", [])
+    ops.append({"file_id": file_id, "from": current_parent_id, "to": archive_folder_id})
+
+
+def _flush_pending_drive_ops(access_token: str):
+    """Send every queued move in one batch call (chunked at Drive's 100 limit).
+
+    Collapses the per-file PATCH round-trips made during a single rerun into
+    one HTTP request. Returns (moved_count, err)."""
+    ops = st.session_state.pop("_pending_drive_ops", [])
+    if not ops:
+        return 0, None
+    
+    moved = 0
+    for start in range(0, len(ops), 100):
+        chunk = ops[start:start + 100]
+        request_lines = [
+            f"PATCH /drive/v3/files/{op['file_id']}"
+            f"?addParents={op['to']}&removeParents={op['from']}&supportsAllDrives=true HTTP/1.1"
+            for op in chunk
+        ]
+        statuses, err = drive_batch(access_token, request_lines)
+        if err:
+            return moved, err
+        moved += sum(1 for code in statuses if code == 200)
+    
+    for folder_id in {op["from"] for op in ops}:
+        _invalidate_drive_listings(folder_id)
+    return moved, None
+
+
 def get_existing_project_names():
     """Get list of existing project client names from database."""
     from services.database_manager import get_engine
@@ -351,17 +563,15 @@ def create_migrated_project(folder_name: str, drive_link: str, drive_folder_id:
     if engine is None:
         return None, "Database not connected"
     
-    project_id = str(uuid.uuid4())
-    
     try:
         with engine.connect() as conn:
-            conn.execute(
+            result = conn.execute(
                 text("""
                     INSERT INTO projects (id, tenant_id, client_name, status, notes, google_drive_link, google_drive_folder_id, is_active_v3, created_at)
-                    VALUES (:id, :tenant_id, :client_name, :status, :notes, :drive_link, :drive_folder_id, TRUE, NOW())
+                    VALUES (gen_random_uuid(), :tenant_id, :client_name, :status, :notes, :drive_link, :drive_folder_id, TRUE, NOW())
+                    RETURNING id
                 """),
                 {
-                    "id": project_id,
                     "tenant_id": TENANT_ID,
                     "client_name": folder_name,
                     "status": "MIGRATED",
@@ -370,12 +580,53 @@ def create_migrated_project(folder_name: str, drive_link: str, drive_folder_id:
                     "drive_folder_id": drive_folder_id
                 }
             )
+            project_id = str(result.scalar_one())
             conn.commit()
             return project_id, None
     except SQLAlchemyError as e:
         return None, f"Database error: {str(e)}"
 
 
+def create_migrated_projects_bulk(folders: list) -> tuple:
+    """Create MIGRATED projects for many Drive folders in one transaction.
+    Returns (imported_count, errors). One multi-row INSERT and one commit
+    replaces a connect/insert/commit cycle per folder."""
+    from services.database_manager import get_engine
+    
+    engine = get_engine()
+    if engine is None:
+        return 0, ["Database not connected"]
+    
+    notes = f"Imported from Google Drive on {now_mountain().strftime('%Y-%m-%d')}"
+    rows = [
+        {
+            "tenant_id": TENANT_ID,
+            "client_name": folder["name"],
+            "status": "MIGRATED",
+            "notes": notes,
+            "drive_link": folder.get("webViewLink", ""),
+            "drive_folder_id": folder["id"]
+        }
+        for folder in folders
+    ]
+    
+    if not rows:
+        return 0, []
+    
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO projects (id, tenant_id, client_name, status, notes, google_drive_link, google_drive_folder_id, is_active_v3, created_at)
+                    VALUES (gen_random_uuid(), :tenant_id, :client_name, :status, :notes, :drive_link, :drive_folder_id, TRUE, NOW())
+                """),
+                rows
+            )
+        return len(rows), []
+    except SQLAlchemyError as e:
+        return 0, [f"Database error: {str(e)}"]
+
+
 def render_migration_dashboard():
     """Render the temporary migration dashboard."""
     st.markdown(
@@ -412,9 +663,13 @@ def render_migration_dashboard():
         st.error(f"Error scanning folders: {err}")
         return
     
-    existing_projects = get_existing_project_names()
-    existing_names = {name.lower().strip() for name, _ in existing_projects}
-    existing_links = {link for _, link in existing_projects if link}
+    existing_names = set()
+    existing_links = set()
+    for name, link in get_existing_project_names():
+        if name:
+            existing_names.add(name.lower().strip())
+        if link:
+            existing_links.add(link)
     
     unlinked_folders = []
     for folder in project_folders:
@@ -424,8 +679,9 @@ def render_migration_dashboard():
         if folder_name.startswith("_"):
             continue
         
+        normalized_name = folder_name.lower().strip()
         is_linked = (
-            folder_name.lower().strip() in existing_names or
+            normalized_name in existing_names or
             folder_link in existing_links
         )
         
@@ -453,35 +709,24 @@ def render_migration_dashboard():
         unsafe_allow_html=True
     )
     
-    select_all = st.checkbox("✅ Select All", key="select_all_migrate", value=False)
-    st.markdown("---")
+    selection_df = pd.DataFrame([
+        {"Select": False, "Folder": folder["name"], "Link": folder.get("webViewLink", "")}
+        for folder in unlinked_folders
+    ])
+    
+    edited = st.data_editor(
+        selection_df,
+        column_config={
+            "Select": st.column_config.CheckboxColumn("Select", default=False),
+            "Folder": st.column_config.TextColumn("Folder", disabled=True),
+            "Link": st.column_config.LinkColumn("Link", display_text="Open in Drive ↗", disabled=True)
+        },
+        hide_index=True,
+        use_container_width=True,
+        key="migrate_editor"
+    )
     
-    selected_folders = []
-    
-    for folder in unlinked_folders:
-        col1, col2 = st.columns([0.1, 0.9])
-        with col1:
-            default_val = select_all
-            is_selected = st.checkbox("", key=f"migrate_{folder['id']}", label_visibility="collapsed", value=default_val)
-        with col2:
-            st.markdown(
-                f'''
-                <div style="
-                    background: #1b263b;
-                    border-radius: 8px;
-                    padding: 12px 16px;
-                    margin-bottom: 8px;
-                    border-left: 4px solid {'#00A8E8' if is_selected else '#666'};
-                ">
-                    <span style="color: #FFFFFF; font-weight: 600;">{folder["name"]}</span>
-                    <a href="{folder.get('webViewLink', '#')}" target="_blank" style="color: #00A8E8; margin-left: 12px; font-size: 12px;">Open in Drive ↗</a>
-                </div>
-                ''',
-                unsafe_allow_html=True
-            )
-        
-        if is_selected:
-            selected_folders.append(folder)
+    selected_folders = [unlinked_folders[i] for i, sel in enumerate(edited["Select"]) if sel]
     
     st.markdown("---")
     
@@ -489,29 +734,8 @@ def render_migration_dashboard():
         st.info(f"**{len(selected_folders)}** folder(s) selected for import")
         
         if st.button("🚀 Import Selected as Projects", type="primary", use_container_width=True):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            imported_count = 0
-            errors = []
-            
-            for idx, folder in enumerate(selected_folders):
-                status_text.text(f"Importing: {folder['name']}...")
-                progress_bar.progress((idx + 1) / len(selected_folders))
-                
-                project_id, err = create_migrated_project(
-                    folder["name"],
-                    folder.get("webViewLink", ""),
-                    folder["id"]
-                )
-                
-                if err:
-                    errors.append(f"{folder['name']}: {err}")
-                else:
-                    imported_count += 1
-            
-            progress_bar.progress(1.0)
-            status_text.empty()
+            with st.spinner(f"Importing {len(selected_folders)} folder(s)..."):
+                imported_count, errors = create_migrated_projects_bulk(selected_folders)
             
             if imported_count > 0:
                 st.success(f"✅ Successfully imported {imported_count} project(s) with status 'MIGRATED'")
@@ -549,23 +773,31 @@ def delete_drive_file(access_token: str, file_id: str):
     headers = {"Authorization": f"Bearer {access_token}"}
     
     try:
-        response = requests.delete(
+        response = _session.delete(
             f"https://www.googleapis.com/drive/v3/files/{file_id}",
             headers=headers,
             params={"supportsAllDrives": "true"},
             timeout=10
         )
-        return response.status_code in [200, 204], None
+        if response.status_code in [200, 204]:
+            # Parent folder unknown here; drop all cached listings.
+            cache = st.session_state.get("_drive_cache", {})
+            for key in [k for k in cache if isinstance(k, tuple) and k[0] != "archive"]:
+                cache.pop(key, None)
+            return True, None
+        return False, f"Delete failed with status {response.status_code}"
     except Exception as e:
         return False, f"Error deleting file: {str(e)}"
 
 
 def download_drive_image(access_token: str, file_id: str) -> tuple:
-    """Download image file content from Shared Drive. Returns (bytes, filename, mime_type, error)."""
+    """Download and validate image file content from Shared Drive.
+    Streams the body into a single buffer and verifies image payloads with
+    PIL before returning. Returns (bytes, filename, mime_type, error)."""
     headers = {"Authorization": f"Bearer {access_token}"}
     
     try:
-        meta_response = requests.get(
+        meta_response = _session.get(
             f"https://www.googleapis.com/drive/v3/files/{file_id}",
             headers=headers,
             params={"fields": "name,mimeType,size", "supportsAllDrives": "true"},
@@ -582,31 +814,59 @@ def download_drive_image(access_token: str, file_id: str) -> tuple:
         if file_size == 0:
             return None, None, None, "File is empty (zero bytes)"
         
-        content_response = requests.get(
+        with _session.get(
             f"https://www.googleapis.com/drive/v3/files/{file_id}",
             headers=headers,
             params={"alt": "media", "supportsAllDrives": "true"},
+            stream=True,
             timeout=30
-        )
-        
-        if content_response.status_code == 200:
-            content = content_response.content
+        ) as content_response:
+            if content_response.status_code != 200:
+                return None, None, None, f"Failed to download: {content_response.status_code}"
             
-            if len(content) < 100:
-                return None, None, None, f"File too small ({len(content)} bytes), likely corrupted"
-            
-            return content, filename, mime_type, None
-        else:
-            return None, None, None, f"Failed to download: {content_response.status_code}"
+            # Stream into one buffer instead of letting requests materialize
+            # .content and then copying it again for validation.
+            buffer = bytearray()
+            for chunk in content_response.iter_content(1 << 16):
+                buffer.extend(chunk)
+        
+        if len(buffer) < 100:
+            return None, None, None, f"File too small ({len(buffer)} bytes), likely corrupted"
+        
+        content = bytes(buffer)
+        
+        if mime_type.startswith("image/") and not is_valid_image_data(content):
+            return None, None, None, "File is not a valid image (corrupted or unsupported format)"
+        
+        return content, filename, mime_type, None
     except Exception as e:
         return None, None, None, f"Error downloading: {str(e)}"
 
 
+# Magic-byte prefixes for the image formats we accept. Checked before
+# handing bytes to PIL so error pages and truncated downloads are
+# rejected without a decode attempt.
+_IMAGE_MAGIC = (
+    b"\xff\xd8\xff",        # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"GIF87a",              # GIF
+    b"GIF89a",              # GIF
+    b"RIFF",                # WebP container
+    b"BM",                  # BMP
+    b"II*\x00",             # TIFF (little-endian)
+    b"MM\x00*",             # TIFF (big-endian)
+)
+
+
 def is_valid_image_data(file_data: bytes) -> bool:
     """Check if bytes represent a valid image that PIL can open."""
     if not file_data or len(file_data) < 100:
         return False
     
+    prefix = file_data[:16]
+    if not any(prefix.startswith(magic) for magic in _IMAGE_MAGIC):
+        return False
+    
     try:
         from PIL import Image
         import io
@@ -635,9 +895,6 @@ def save_drive_image_to_db(project_id: str, file_id: str, photo_type: str, drive
     if mime_type and mime_type.startswith("application/pdf"):
         return False, "File is a PDF, not an image. Use PDF assignment instead."
     
-    if not is_valid_image_data(file_data):
-        return False, "File is not a valid image (corrupted or unsupported format)"
-    
     try:
         save_project_photo(project_id, filename, file_data, photo_type)
         
@@ -656,7 +913,7 @@ def archive_all_remaining_legacy(project_id: str, drive_folder_id: str) -> tuple
     if error:
         return 0, error
     
-    images, err = list_drive_images(access_token, drive_folder_id)
+    images, err = list_drive_images(access_token, drive_folder_id, need_thumbnails=False)
     if err:
         return 0, err
     
@@ -667,16 +924,286 @@ def archive_all_remaining_legacy(project_id: str, drive_folder_id: str) -> tuple
     if err:
         return 0, err
     
+    # One batch call moves up to 100 files in a single round-trip instead of
+    # one PATCH (and one TLS handshake) per image.
     archived_count = 0
-    for image in images:
-        file_id = image.get("id")
-        success, _ = move_file_to_archive(access_token, file_id, drive_folder_id, archive_folder_id)
-        if success:
-            archived_count += 1
-    
+    for start in range(0, len(images), 100):
+        chunk = images[start:start + 100]
+        request_lines = [
+            f"PATCH /drive/v3/files/{image.get('id')}"
+            f"?addParents={archive_folder_id}&removeParents={drive_folder_id}&supportsAllDrives=true HTTP/1.1"
+            for image in chunk
+        ]
+        statuses, err = drive_batch(access_token, request_lines)
+        if err:
+            return archived_count, err
+        archived_count += sum(1 for code in statuses if code == 200)
+
+    _invalidate_drive_listings(drive_folder_id)
     return archived_count, None
 
 
+# Per-card HTML shells for the legacy thumbnail grid, formatted with the
+# file name at render time instead of rebuilding the markup per iteration.
+_CARD_PDF_TMPL = """
+    <div style="
+        background: #1b263b;
+        border-radius: 8px;
+        padding: 20px;
+        text-align: center;
+        border: 1px solid #333;
+    ">
+        <span style="color: #00A8E8; font-size: 24px;">📄</span>
+        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name}...</p>
+        <p style="color: #00A8E8; font-size: 10px; margin: 4px 0 0 0;">PDF Document</p>
+    </div>
+    """
+
+_CARD_UNSUPPORTED_TMPL = """
+    <div style="
+        background: #1b263b;
+        border-radius: 8px;
+        padding: 20px;
+        text-align: center;
+        border: 1px solid #333;
+    ">
+        <span style="color: #666; font-size: 24px;">📁</span>
+        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name}...</p>
+        <p style="color: #ff9800; font-size: 10px; margin: 4px 0 0 0;">⚠️ File type not supported for preview</p>
+    </div>
+    """
+
+_CARD_NO_PREVIEW_TMPL = """
+    <div style="
+        background: #1b263b;
+        border-radius: 8px;
+        padding: 20px;
+        text-align: center;
+        border: 1px solid #333;
+    ">
+        <span style="color: #666; font-size: 24px;">🖼️</span>
+        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name}...</p>
+        <p style="color: #ff9800; font-size: 10px; margin: 4px 0 0 0;">⚠️ Preview not available for this file type</p>
+    </div>
+    """
+
+
+def prefetch_legacy_listings(drive_folder_id: str):
+    """Warm the image and PDF listing caches with concurrent fetches.
+
+    The two listings behind the legacy panels are independent Drive calls,
+    so issue them in parallel worker threads and seed the session cache
+    from the main thread (session state is not thread-safe)."""
+    if not drive_folder_id:
+        return
+    
+    access_token, error = get_drive_access_token()
+    if error:
+        return
+    
+    cache = st.session_state.setdefault("_drive_cache", {})
+    now = time.monotonic()
+    wanted = (
+        (("images", drive_folder_id, True),
+         lambda: _fetch_drive_images(access_token, drive_folder_id, True)),
+        (("pdfs", drive_folder_id, None),
+         lambda: _fetch_drive_pdfs(access_token, drive_folder_id)),
+    )
+    
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for key, fetch in wanted:
+            hit = cache.get(key)
+            if not (hit and hit[1] > now):
+                jobs[key] = pool.submit(fetch)
+        for key, job in jobs.items():
+            value, err = job.result()
+            if not err:
+                cache[key] = ((value, err), time.monotonic() + _LISTING_TTL_SECONDS)
+
+
+def _schedule_rerun():
+    """Mark the current render pass as needing one rerun at its end.
+
+    Handlers that mutate state call this instead of st.rerun() so several
+    successful actions in one script run coalesce into a single rerun."""
+    st.session_state["_rerun_pending"] = True
+
+
+def _flush_scheduled_rerun():
+    """Fire the coalesced rerun, if any handler scheduled one."""
+    if st.session_state.pop("_rerun_pending", False):
+        st.rerun()
+
+
+def _notify(kind: str, message: str):
+    st.session_state["_legacy_op_msg"] = (kind, message)
+
+
+def _consume_op_message():
+    """Surface the outcome of the last on_click action, if one just ran."""
+    msg = st.session_state.pop("_legacy_op_msg", None)
+    if msg:
+        kind, message = msg
+        if kind == "ok":
+            st.toast(message, icon="✅")
+        else:
+            st.error(message)
+
+
+def _handle_category_click(project_id, file_id, category, drive_folder_id, success_msg):
+    """on_click: import a legacy image into a category, then let the natural
+    rerun repaint the page — no explicit st.rerun() double render."""
+    success, err = save_drive_image_to_db(project_id, file_id, category, drive_folder_id)
+    if success:
+        st.session_state.setdefault(f"ai_suggestions_{project_id}", {}).pop(file_id, None)
+        _notify("ok", success_msg)
+    else:
+        _notify("err", f"Failed: {err}")
+    # Errors need the rerun too: the message is only drained by the parent
+    # panel on a full run, and a fragment-scope click never reaches it.
+    _schedule_rerun()
+
+
+def _handle_archive_click(file_id, drive_folder_id):
+    """on_click: move one legacy file into the _ARCHIVE folder."""
+    access_token, error = get_drive_access_token()
+    if error:
+        _notify("err", f"Failed: {error}")
+        _schedule_rerun()
+        return
+    
+    archive_folder_id, err = get_or_create_archive_folder(access_token, drive_folder_id)
+    if err:
+        _notify("err", f"Failed: {err}")
+        _schedule_rerun()
+        return
+    
+    _queue_drive_move(file_id, drive_folder_id, archive_folder_id)
+    moved, err = _flush_pending_drive_ops(access_token)
+    if moved:
+        _notify("ok", "Archived")
+    elif err:
+        _notify("err", f"Failed: {err}")
+    else:
+        # The batch went through at the HTTP level but the sub-request was
+        # rejected — moved == 0 with no transport error.
+        _notify("err", "Failed: Drive rejected the archive move")
+    _schedule_rerun()
+
+
+def _handle_delete_click(file_id):
+    """on_click: permanently delete one legacy Drive file."""
+    access_token, error = get_drive_access_token()
+    if error:
+        _notify("err", f"Failed: {error}")
+        _schedule_rerun()
+        return
+    
+    success, err = delete_drive_file(access_token, file_id)
+    if success:
+        _notify("ok", "Deleted")
+    else:
+        _notify("err", f"Failed: {err}")
+    _schedule_rerun()
+
+
+def _handle_assign_click(project_id, file_id, file_name, slot_type, drive_folder_id, success_msg):
+    """on_click: assign a legacy PDF to a slot and archive it."""
+    success, err = assign_pdf_to_slot(project_id, file_id, file_name, slot_type, drive_folder_id)
+    if success:
+        _notify("ok", success_msg)
+    else:
+        _notify("err", f"Failed: {err}")
+    _schedule_rerun()
+
+
+# (category, widget-key part, button icon, success toast) for the three
+# category buttons — one loop instead of three copy-pasted blocks.
+_CAT_BUTTONS = (
+    ("logo", "logo", "🎨 Logo", "Added as Logo!"),
+    ("site", "site", "🏗️ Site", "Added as Site Photo!"),
+    ("reference", "ref", "💡 Ref", "Added as Reference!"),
+)
+
+
+@st.fragment
+def _render_image_card(image, project_id, drive_folder_id, access_token, ai_suggestions):
+    """Render one legacy image card. As a fragment, a click inside the card
+    re-executes only this card instead of the whole page script."""
+    thumbnail_url = image.get("thumbnailLink", "")
+    # Ask Drive for a fixed-size variant so the browser never pulls
+    # the default (much larger) thumbnail for a 220px-wide cell.
+    if thumbnail_url:
+        if "=s" in thumbnail_url:
+            thumbnail_url = thumbnail_url[:thumbnail_url.rindex("=s")] + "=s320"
+        else:
+            thumbnail_url += "=s320"
+    file_id = image.get("id", "")
+    file_name = image.get("name", "Image")
+    mime_type = image.get("mimeType", "")
+
+    suggested_cat = ai_suggestions.get(file_id, None)
+    # Widget keys share this suffix; format it once per card.
+    kp = f"{project_id}_{file_id}"
+
+    web_link = image.get("webViewLink", "")
+
+    is_pdf = mime_type == "application/pdf"
+    is_supported_image = mime_type in ALLOWED_IMAGE_MIMES
+
+    if is_pdf:
+        st.markdown(_CARD_PDF_TMPL.format(file_name=file_name[:20]), unsafe_allow_html=True)
+        if web_link:
+            st.link_button("View PDF in Drive", web_link, use_container_width=True)
+        return
+
+    if not is_supported_image:
+        st.markdown(_CARD_UNSUPPORTED_TMPL.format(file_name=file_name[:20]), unsafe_allow_html=True)
+        if web_link:
+            st.link_button("Open in Drive", web_link, use_container_width=True)
+        return
+
+    try:
+        if thumbnail_url:
+            st.image(thumbnail_url, caption=file_name[:30], width=220)
+        else:
+            raise ValueError("No thumbnail available")
+    except Exception:
+        st.markdown(_CARD_NO_PREVIEW_TMPL.format(file_name=file_name[:20]), unsafe_allow_html=True)
+        if web_link:
+            st.link_button("Open in Drive", web_link, use_container_width=True)
+
+    # One column group hosts all five actions; the extra st.columns call
+    # per card (and its delta messages) is gone.
+    action_cols = st.columns([3, 3, 3, 2, 2])
+
+    for col, (category, key_part, icon, success_msg) in zip(action_cols, _CAT_BUTTONS):
+        with col:
+            is_suggested = suggested_cat == category
+            label = f"{icon} ✓" if is_suggested else icon
+            btn_type = "primary" if is_suggested else "secondary"
+            st.button(
+                label, key=f"cat_{key_part}_{kp}", use_container_width=True, type=btn_type,
+                on_click=_handle_category_click,
+                args=(project_id, file_id, category, drive_folder_id, success_msg)
+            )
+
+    with action_cols[3]:
+        st.button(
+            "📦", key=f"arch_{kp}", use_container_width=True, help="Archive",
+            on_click=_handle_archive_click, args=(file_id, drive_folder_id)
+        )
+    with action_cols[4]:
+        st.button(
+            "🗑️", key=f"del_{kp}", use_container_width=True, help="Delete",
+            on_click=_handle_delete_click, args=(file_id,)
+        )
+
+    st.markdown("<hr style='border: none; border-top: 1px solid #333; margin: 12px 0;'>", unsafe_allow_html=True)
+    _flush_scheduled_rerun()
+
+
 def render_legacy_thumbnails(project_id: str, drive_folder_id: str):
     """Render legacy Drive images with one-click category assignment and AI Smart-Sort."""
     if not drive_folder_id:
@@ -690,7 +1217,10 @@ def render_legacy_thumbnails(project_id: str, drive_folder_id: str):
     if err or not images:
         return
     
-    ai_suggestions = st.session_state.get(f"ai_suggestions_{project_id}", {})
+    _consume_op_message()
+    
+    ai_key = f"ai_suggestions_{project_id}"
+    ai_suggestions = st.session_state.setdefault(ai_key, {})
     
     st.markdown(
         f'''
@@ -713,10 +1243,15 @@ def render_legacy_thumbnails(project_id: str, drive_folder_id: str):
         if st.button("🤖 Run AI Smart-Sort", key=f"ai_sort_{project_id}", use_container_width=True, type="secondary"):
             from services.gemini_service import batch_analyze_images
             with st.spinner("Analyzing images with AI..."):
-                suggestions = batch_analyze_images(images)
-                st.session_state[f"ai_suggestions_{project_id}"] = suggestions
+                # Only ship Gemini the images it can actually analyze.
+                images_for_ai = [
+                    i for i in images
+                    if i.get("mimeType") in ALLOWED_IMAGE_MIMES and int(i.get("size", 0) or 0) > 100
+                ]
+                suggestions = batch_analyze_images(images_for_ai)
+                st.session_state[ai_key] = suggestions
                 st.success(f"AI analyzed {len(suggestions)} images!")
-                st.rerun()
+                _schedule_rerun()
     
     with header_cols[1]:
         if st.button("📦 Archive All Remaining", key=f"archive_all_{project_id}", use_container_width=True, type="secondary"):
@@ -726,7 +1261,7 @@ def render_legacy_thumbnails(project_id: str, drive_folder_id: str):
                     st.error(f"Error: {err}")
                 else:
                     st.success(f"Archived {count} images!")
-                    st.rerun()
+                    _schedule_rerun()
     
     with header_cols[2]:
         if ai_suggestions:
@@ -738,148 +1273,12 @@ def render_legacy_thumbnails(project_id: str, drive_folder_id: str):
     st.markdown("<br>", unsafe_allow_html=True)
     
     cols = st.columns(3)
-    SUPPORTED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/jpg", "image/gif", "image/webp"]
     
-    for idx, image in enumerate(images[:12]):
+    for idx, image in enumerate(islice(images, 12)):
         with cols[idx % 3]:
-            thumbnail_url = image.get("thumbnailLink", "")
-            file_id = image.get("id", "")
-            file_name = image.get("name", "Image")
-            mime_type = image.get("mimeType", "")
-            
-            suggested_cat = ai_suggestions.get(file_id, None)
-            
-            web_link = image.get("webViewLink", "")
-            
-            is_pdf = mime_type == "application/pdf"
-            is_supported_image = mime_type in SUPPORTED_IMAGE_TYPES
-            
-            if is_pdf:
-                st.markdown(
-                    f'''
-                    <div style="
-                        background: #1b263b;
-                        border-radius: 8px;
-                        padding: 20px;
-                        text-align: center;
-                        border: 1px solid #333;
-                    ">
-                        <span style="color: #00A8E8; font-size: 24px;">📄</span>
-                        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name[:20]}...</p>
-                        <p style="color: #00A8E8; font-size: 10px; margin: 4px 0 0 0;">PDF Document</p>
-                    </div>
-                    ''',
-                    unsafe_allow_html=True
-                )
-                if web_link:
-                    st.link_button("View PDF in Drive", web_link, use_container_width=True)
-                continue
-            
-            if not is_supported_image:
-                st.markdown(
-                    f'''
-                    <div style="
-                        background: #1b263b;
-                        border-radius: 8px;
-                        padding: 20px;
-                        text-align: center;
-                        border: 1px solid #333;
-                    ">
-                        <span style="color: #666; font-size: 24px;">📁</span>
-                        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name[:20]}...</p>
-                        <p style="color: #ff9800; font-size: 10px; margin: 4px 0 0 0;">⚠️ File type not supported for preview</p>
-                    </div>
-                    ''',
-                    unsafe_allow_html=True
-                )
-                if web_link:
-                    st.link_button("Open in Drive", web_link, use_container_width=True)
-                continue
-            
-            try:
-                if thumbnail_url:
-                    st.image(thumbnail_url, caption=file_name[:30], use_container_width=True)
-                else:
-                    raise ValueError("No thumbnail available")
-            except Exception:
-                st.markdown(
-                    f'''
-                    <div style="
-                        background: #1b263b;
-                        border-radius: 8px;
-                        padding: 20px;
-                        text-align: center;
-                        border: 1px solid #333;
-                    ">
-                        <span style="color: #666; font-size: 24px;">🖼️</span>
-                        <p style="color: #888; font-size: 11px; margin: 4px 0 0 0;">{file_name[:20]}...</p>
-                        <p style="color: #ff9800; font-size: 10px; margin: 4px 0 0 0;">⚠️ Preview not available for this file type</p>
-                    </div>
-                    ''',
-                    unsafe_allow_html=True
-                )
-                if web_link:
-                    st.link_button("Open in Drive", web_link, use_container_width=True)
-            
-            cat_cols = st.columns(3)
-            
-            with cat_cols[0]:
-                btn_type = "primary" if suggested_cat == "logo" else "secondary"
-                label = "🎨 Logo" if suggested_cat != "logo" else "🎨 Logo ✓"
-                if st.button(label, key=f"cat_logo_{project_id}_{file_id}", use_container_width=True, type=btn_type):
-                    with st.spinner("Importing..."):
-                        success, err = save_drive_image_to_db(project_id, file_id, "logo", drive_folder_id)
-                        if success:
-                            st.success("Added as Logo!")
-                            if file_id in ai_suggestions:
-                                del st.session_state[f"ai_suggestions_{project_id}"][file_id]
-                            st.rerun()
-                        else:
-                            st.error(f"Failed: {err}")
-            
-            with cat_cols[1]:
-                btn_type = "primary" if suggested_cat == "site" else "secondary"
-                label = "🏗️ Site" if suggested_cat != "site" else "🏗️ Site ✓"
-                if st.button(label, key=f"cat_site_{project_id}_{file_id}", use_container_width=True, type=btn_type):
-                    with st.spinner("Importing..."):
-                        success, err = save_drive_image_to_db(project_id, file_id, "site", drive_folder_id)
-                        if success:
-                            st.success("Added as Site Photo!")
-                            if file_id in ai_suggestions:
-                                del st.session_state[f"ai_suggestions_{project_id}"][file_id]
-                            st.rerun()
-                        else:
-                            st.error(f"Failed: {err}")
-            
-            with cat_cols[2]:
-                btn_type = "primary" if suggested_cat == "reference" else "secondary"
-                label = "💡 Ref" if suggested_cat != "reference" else "💡 Ref ✓"
-                if st.button(label, key=f"cat_ref_{project_id}_{file_id}", use_container_width=True, type=btn_type):
-                    with st.spinner("Importing..."):
-                        success, err = save_drive_image_to_db(project_id, file_id, "reference", drive_folder_id)
-                        if success:
-                            st.success("Added as Reference!")
-                            if file_id in ai_suggestions:
-                                del st.session_state[f"ai_suggestions_{project_id}"][file_id]
-                            st.rerun()
-                        else:
-                            st.error(f"Failed: {err}")
-            
-            archive_del_cols = st.columns(2)
-            with archive_del_cols[0]:
-                if st.button("📦", key=f"arch_{project_id}_{file_id}", use_container_width=True, help="Archive"):
-                    archive_folder_id, err = get_or_create_archive_folder(access_token, drive_folder_id)
-                    if not err:
-                        success, err = move_file_to_archive(access_token, file_id, drive_folder_id, archive_folder_id)
-                        if success:
-                            st.rerun()
-            with archive_del_cols[1]:
-                if st.button("🗑️", key=f"del_{project_id}_{file_id}", use_container_width=True, help="Delete"):
-                    success, err = delete_drive_file(access_token, file_id)
-                    if success:
-                        st.rerun()
-            
-            st.markdown("<hr style='border: none; border-top: 1px solid #333; margin: 12px 0;'>", unsafe_allow_html=True)
+            _render_image_card(image, project_id, drive_folder_id, access_token, ai_suggestions)
+    
+    _flush_scheduled_rerun()
 
 
 def archive_drive_file(file_id: str, parent_folder_id: str):
@@ -892,24 +1291,28 @@ def archive_drive_file(file_id: str, parent_folder_id: str):
     if err:
         return False, err
     
-    success, err = move_file_to_archive(access_token, file_id, parent_folder_id, archive_folder_id)
-    return success, err
+    _queue_drive_move(file_id, parent_folder_id, archive_folder_id)
+    moved, err = _flush_pending_drive_ops(access_token)
+    return moved > 0, err
+
+
+# Keyword alternations for PDF slot suggestions, compiled once so each
+# filename gets a single case-insensitive scan instead of one substring
+# search per keyword.
+_PROPOSAL_RE = re.compile(r"proposal|estimate|quote|pric(?:e|ing)|bid", re.I)
+_DESIGN_RE = re.compile(r"design|proof|layout|mock-?up|art", re.I)
 
 
 def get_pdf_slot_suggestion(filename: str) -> str:
     """Determine suggested slot based on filename keywords."""
-    name_lower = filename.lower()
+    if not filename:
+        return None
     
-    proposal_keywords = ["proposal", "estimate", "quote", "price", "pricing", "bid"]
-    design_keywords = ["design", "proof", "layout", "mockup", "mock-up", "artwork", "art"]
+    if _PROPOSAL_RE.search(filename):
+        return "proposal"
     
-    for kw in proposal_keywords:
-        if kw in name_lower:
-            return "proposal"
-    
-    for kw in design_keywords:
-        if kw in name_lower:
-            return "design"
+    if _DESIGN_RE.search(filename):
+        return "design"
     
     return None
 
@@ -930,12 +1333,79 @@ def assign_pdf_to_slot(project_id: str, file_id: str, filename: str, slot_type:
         if not error:
             archive_folder_id, err = get_or_create_archive_folder(access_token, drive_folder_id)
             if not err:
-                move_file_to_archive(access_token, file_id, drive_folder_id, archive_folder_id)
+                # Join any moves already queued this rerun so the assignment
+                # costs one batched Drive round-trip after the DB update.
+                _queue_drive_move(file_id, drive_folder_id, archive_folder_id)
+                _flush_pending_drive_ops(access_token)
         return True, None
     else:
         return False, "Failed to update database"
 
 
+_PDF_CARD_TMPL = """
+    <div style="
+        background: #1b263b;
+        border-radius: 8px;
+        padding: 12px;
+        margin: 8px 0;
+        border: 1px solid #333;
+        display: flex;
+        align-items: center;
+    ">
+        <span style="font-size: 28px; margin-right: 12px;">📄</span>
+        <div>
+            <p style="color: #E5E5E5; margin: 0; font-size: 14px; font-weight: 500;">{file_name}</p>
+            <p style="color: #666; margin: 2px 0 0 0; font-size: 11px;">PDF Document</p>
+        </div>
+    </div>
+    """
+
+
+@st.fragment
+def _render_pdf_card(pdf, project_id, drive_folder_id, access_token):
+    """Render one legacy PDF card as a fragment (see _render_image_card)."""
+    file_id = pdf.get("id", "")
+    file_name = pdf.get("name", "Document.pdf")
+    web_link = pdf.get("webViewLink", "")
+
+    suggested_slot = get_pdf_slot_suggestion(file_name)
+    kp = f"{project_id}_{file_id}"
+
+    st.caption(f"📄 {file_name[:40]}")
+
+    btn_cols = st.columns([1, 1, 1, 1])
+
+    with btn_cols[0]:
+        proposal_type = "primary" if suggested_slot == "proposal" else "secondary"
+        proposal_label = "📄 Proposal ✓" if suggested_slot == "proposal" else "📄 Proposal"
+        st.button(
+            proposal_label, key=f"pdf_proposal_{kp}", use_container_width=True, type=proposal_type,
+            on_click=_handle_assign_click,
+            args=(project_id, file_id, file_name, "proposal", drive_folder_id, "Assigned as Proposal!")
+        )
+
+    with btn_cols[1]:
+        design_type = "primary" if suggested_slot == "design" else "secondary"
+        design_label = "🎨 Design ✓" if suggested_slot == "design" else "🎨 Design"
+        st.button(
+            design_label, key=f"pdf_design_{kp}", use_container_width=True, type=design_type,
+            on_click=_handle_assign_click,
+            args=(project_id, file_id, file_name, "design", drive_folder_id, "Assigned as Design Proof!")
+        )
+
+    with btn_cols[2]:
+        if web_link:
+            st.link_button("👁️ View", web_link, use_container_width=True)
+
+    with btn_cols[3]:
+        st.button(
+            "📦", key=f"pdf_arch_{kp}", use_container_width=True, help="Archive",
+            on_click=_handle_archive_click, args=(file_id, drive_folder_id)
+        )
+
+    _flush_scheduled_rerun()
+
+
 def render_legacy_pdfs(project_id: str, drive_folder_id: str):
     """Render legacy PDFs with direct-to-slot assignment buttons."""
     if not drive_folder_id:
@@ -945,8 +1415,21 @@ def render_legacy_pdfs(project_id: str, drive_folder_id: str):
     if error:
         return
     
-    pdfs, err = list_drive_pdfs(access_token, drive_folder_id)
-    if err or not pdfs:
+    _consume_op_message()
+    
+    cursor_key = f"pdf_cursor_{project_id}"
+    page_tokens = st.session_state.setdefault(cursor_key, [None])
+    
+    pdfs = []
+    next_token = None
+    for page_token in page_tokens:
+        page, err = list_drive_pdfs(access_token, drive_folder_id, page_token)
+        if err:
+            break
+        files, next_token = page
+        pdfs.extend(files)
+    
+    if not pdfs:
         return
     
     st.markdown(
@@ -965,68 +1448,19 @@ def render_legacy_pdfs(project_id: str, drive_folder_id: str):
         unsafe_allow_html=True
     )
     
-    for pdf in pdfs[:10]:
-        file_id = pdf.get("id", "")
-        file_name = pdf.get("name", "Document.pdf")
-        web_link = pdf.get("webViewLink", "")
-        
-        suggested_slot = get_pdf_slot_suggestion(file_name)
-        
-        st.markdown(
-            f'''
-            <div style="
-                background: #1b263b;
-                border-radius: 8px;
-                padding: 12px;
-                margin: 8px 0;
-                border: 1px solid #333;
-                display: flex;
-                align-items: center;
-            ">
-                <span style="font-size: 28px; margin-right: 12px;">📄</span>
-                <div>
-                    <p style="color: #E5E5E5; margin: 0; font-size: 14px; font-weight: 500;">{file_name[:40]}</p>
-                    <p style="color: #666; margin: 2px 0 0 0; font-size: 11px;">PDF Document</p>
-                </div>
-            </div>
-            ''',
-            unsafe_allow_html=True
-        )
-        
-        btn_cols = st.columns([1, 1, 1, 1])
-        
-        with btn_cols[0]:
-            proposal_type = "primary" if suggested_slot == "proposal" else "secondary"
-            proposal_label = "📄 Proposal ✓" if suggested_slot == "proposal" else "📄 Proposal"
-            if st.button(proposal_label, key=f"pdf_proposal_{project_id}_{file_id}", use_container_width=True, type=proposal_type):
-                with st.spinner("Assigning..."):
-                    success, err = assign_pdf_to_slot(project_id, file_id, file_name, "proposal", drive_folder_id)
-                    if success:
-                        st.success("Assigned as Proposal!")
-                        st.rerun()
-                    else:
-                        st.error(f"Failed: {err}")
-        
-        with btn_cols[1]:
-            design_type = "primary" if suggested_slot == "design" else "secondary"
-            design_label = "🎨 Design ✓" if suggested_slot == "design" else "🎨 Design"
-            if st.button(design_label, key=f"pdf_design_{project_id}_{file_id}", use_container_width=True, type=design_type):
-                with st.spinner("Assigning..."):
-                    success, err = assign_pdf_to_slot(project_id, file_id, file_name, "design", drive_folder_id)
-                    if success:
-                        st.success("Assigned as Design Proof!")
-                        st.rerun()
-                    else:
-                        st.error(f"Failed: {err}")
-        
-        with btn_cols[2]:
-            if web_link:
-                st.link_button("👁️ View", web_link, use_container_width=True)
-        
-        with btn_cols[3]:
-            if st.button("📦", key=f"pdf_arch_{project_id}_{file_id}", use_container_width=True, help="Archive"):
-                archive_folder_id, err = get_or_create_archive_folder(access_token, drive_folder_id)
-                if not err:
-                    success, err = move_file_to_archive(access_token, file_id, drive_folder_id, archive_folder_id)
-                    if success:
-                        st.rerun()
+    # All card shells go out in one markdown message instead of one per
+    # PDF; the button rows below stay per-file, captioned with the name.
+    st.markdown(
+        "".join(_PDF_CARD_TMPL.format(file_name=pdf.get("name", "Document.pdf")[:40]) for pdf in pdfs),
+        unsafe_allow_html=True
+    )
+    
+    for pdf in pdfs:
+        _render_pdf_card(pdf, project_id, drive_folder_id, access_token)
+    
+    if next_token:
+        if st.button("⬇️ Load more PDFs", key=f"pdf_more_{project_id}", use_container_width=True):
+            page_tokens.append(next_token)
+            _schedule_rerun()
+    
+    _flush_scheduled_rerun()
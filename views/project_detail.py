@@ -1,20 +1,42 @@
 import streamlit as st
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, date
+from string import Template
+from urllib.parse import quote_plus
 from PIL import Image, ImageDraw, ImageFont
 import io
 import base64
 from streamlit_drawable_canvas import st_canvas
-from services.database_manager import get_project_by_id, get_status_badge, update_project_status_with_note, delete_project, update_no_design_required, update_action_status, add_project_history, update_project_identity, mark_project_won, mark_project_lost
+from services.database_manager import archive_project, restore_project, get_project_by_id, get_project_bundle, get_status_badge, update_project_status_with_note, delete_project, update_no_design_required, update_action_status, add_project_history, update_project_identity, mark_project_won, mark_project_lost
+from services.database_manager import get_photos_by_categories, save_project_photo, save_project_photos, delete_project_photo, get_next_photo_index
+from views.migration_util import (
+    get_drive_access_token, find_drive_folder_fuzzy, update_project_drive_folder,
+    extract_folder_id_from_url, archive_drive_file,
+    render_legacy_thumbnails, render_legacy_pdfs, prefetch_legacy_listings
+)
 from services.email_service import send_email
 from services.gemini_service import draft_design_email, draft_pricing_email, draft_proposal_email
 from services.timezone_utils import today_mountain, now_mountain, get_timestamp_mountain, get_file_timestamp_mountain
+from components.icons import get_icon
 
+# Imported once; the sentinel keeps the per-rerun guard to a bool check
+# instead of a try/except import.
+try:
+    from streamlit_js_eval import streamlit_js_eval
+    _HAS_JS_EVAL = True
+except ImportError:
+    streamlit_js_eval = None
+    _HAS_JS_EVAL = False
 
-def render_project_detail():
-    """Render the Project Detail View - Matt & Bruno Loop."""
-    # Inject scroll preservation JavaScript - saves position before rerun and restores after
-    scroll_preservation_js = """
+
+
+# Static markup rendered on every rerun — built once at import instead of
+# re-allocated inside the render functions.
+_SCROLL_PRESERVATION_JS = """
     <script>
     (function() {
         // Restore scroll position if saved
@@ -36,16 +58,220 @@ def render_project_detail():
     })();
     </script>
     """
-    st.markdown(scroll_preservation_js, unsafe_allow_html=True)
+
+_PROD_LOCK_HTML = '''
+            <div style="
+                background: linear-gradient(145deg, #ff4444 0%, #cc0000 100%);
+                border-radius: 8px;
+                padding: 12px 20px;
+                margin: 0 0 16px 0;
+                text-align: center;
+            ">
+                <p style="color: white; margin: 0; font-size: 16px; font-weight: 700;">
+                    🔒 PRODUCTION LOCKED: No design changes permitted without a Change Order.
+                </p>
+            </div>
+            '''
+
+_IDENTITY_CARD_HTML = '''
+            <div style="
+                background: linear-gradient(145deg, #1a2a3a 0%, #0d1b2a 100%);
+                border-radius: 12px;
+                padding: 16px;
+                margin-bottom: 16px;
+                border: 1px solid #00A8E8;
+            ">
+                <p style="color: #00A8E8; font-size: 13px; margin: 0; font-weight: 600;">
+                    🏢 Project Details & Contact Information
+                </p>
+            </div>
+            '''
+
+_ESCAPE_HATCH_STYLE = '''
+                <style>
+                    div[data-testid="stButton"] button[kind="secondary"][data-testid*="escape_hatch"] {
+                        border: 1px solid #ff4444 !important;
+                        color: #ff6666 !important;
+                        background: transparent !important;
+                        font-size: 12px !important;
+                        padding: 4px 12px !important;
+                    }
+                </style>
+                '''
+
+# Strips every non-digit codepoint (not just ASCII — pasted numbers carry
+# en-dashes and full-width digits) in one C-level pass for tel: links.
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+_CONTACT_LINKS_TMPL = '<div style="display: flex; gap: 16px; margin: 4px 0 0 0;">{links}</div>'
+
+_STICKY_HEADER_TMPL = Template('''
+            <div style="padding: 10px 0;">
+                <h1 style="color: #E5E5E5; margin: 0; font-size: 28px;">$client_name</h1>
+                <p style="color: #00A8E8; margin: 4px 0 0 0; font-size: 14px;">
+                    Status: $status $badge
+                </p>
+            </div>
+            ''')
+
+
+# Recording UI for the voice dictation modal: static indicator markup and
+# the recognition promise, built once at import so the open-modal rerun
+# loop re-sends identical component payloads instead of rebuilding them.
+_REC_INDICATOR_HTML = """
+<style>
+    @keyframes pulse { 0%,100% { opacity:1; transform:scale(1); } 50% { opacity:0.7; transform:scale(1.05); } }
+    .rec-box { color:#e74c3c; font-size:18px; animation:pulse 1s infinite; padding:20px; background:linear-gradient(145deg, #2a0a0a 0%, #1a0505 100%); border-radius:12px; border:2px solid #e74c3c; text-align:center; margin:10px 0; }
+</style>
+<div class="rec-box">🔴 Listening... Speak now!</div>
+"""
+
+_VOICE_PROMISE_JS = Template("""
+new Promise((resolve) => {
+    console.log('[VoiceDictation] Starting modal recognition for: $voice_key');
+    const SR = window.SpeechRecognition || window.webkitSpeechRecognition;
+    if (!SR) { console.error('[VoiceDictation] Not supported'); resolve(JSON.stringify({type:'error', value:'not_supported'})); return; }
+    const r = new SR();
+    r.lang = 'en-US';
+    r.interimResults = false;
+    r.maxAlternatives = 1;
+    r.onresult = (e) => resolve(JSON.stringify({type:'result', value:e.results[0][0].transcript}));
+    r.onerror = (e) => resolve(JSON.stringify({type:'error', value:e.error}));
+    r.onend = () => resolve(JSON.stringify({type:'no_result'}));
+    try { r.start(); } catch(e) { console.error('[VoiceDictation] Modal start failed:', e); resolve(JSON.stringify({type:'error', value:'start_failed'})); }
+})
+""")
+
+
+# Statuses that collapse Blocks A-D into focus mode, and statuses that hide
+# the escape-hatch Lost button (the header keeps the hyphen when it
+# normalizes, hence the separate spelling).
+_FOCUS_MODE_STATUSES = frozenset({
+    "active_production", "production", "in_production", "installed",
+    "completed", "invoiced", "permit_pending"
+})
+_LOST_HIDDEN_STATUSES = frozenset({"closed_-_won", "closed_-_lost", "completed", "archived"})
+
+# Which block expands by default for a given status; one dict hash instead
+# of four membership scans per rerun.
+_EXPAND_MAP = {
+    "migrated": "A", "lead": "A",
+    "design": "B",
+    "quoting": "C", "proposal": "C", "pricing": "C",
+    "awaiting_deposit": "D", "awaiting": "D", "confirmed": "D", "approved": "D",
+}
+
+
+# Project-row fields the detail page reads, with the default each one
+# coerces to when the column is NULL or empty.
+_DEFAULTS = {
+    "client_name": "Unknown Client",
+    "status": "pending",
+    "notes": "",
+    "estimated_value": 0,
+    "google_drive_link": "",
+    "google_drive_folder_id": "",
+    "date_applied": None,
+    "permit_number": "",
+    "permit_office_phone": "",
+    "site_address": "",
+    "design_proof_drive_id": "",
+    "design_proof_name": "",
+    "proposal_drive_id": "",
+    "proposal_name": "",
+    "no_design_required": False,
+    "master_spec_file_id": "",
+    "master_spec_file_name": "",
+    "master_spec_locked_at": None,
+    "production_locked": False,
+    "signed_spec_file_id": "",
+    "signed_spec_file_name": "",
+    "pending_action": False,
+    "action_note": "",
+    "action_due_date": None,
+    "primary_contact_name": "",
+    "primary_contact_phone": "",
+    "primary_contact_email": "",
+    "secondary_contact_name": "",
+    "secondary_contact_phone": "",
+    "secondary_contact_email": "",
+    "deposit_received_date": None,
+    "deposit_amount": 0,
+    "deposit_invoice_requested": False,
+    "deposit_invoice_sent": False,
+}
+
+
+@dataclass(slots=True)
+class ProjectView:
+    """Unpacked project row: one pass over _DEFAULTS replaces the long run
+    of per-field `project.get(...) or default` reads."""
+    client_name: str
+    status: str
+    notes: str
+    estimated_value: float
+    google_drive_link: str
+    google_drive_folder_id: str
+    date_applied: object
+    permit_number: str
+    permit_office_phone: str
+    site_address: str
+    design_proof_drive_id: str
+    design_proof_name: str
+    proposal_drive_id: str
+    proposal_name: str
+    no_design_required: bool
+    master_spec_file_id: str
+    master_spec_file_name: str
+    master_spec_locked_at: object
+    production_locked: bool
+    signed_spec_file_id: str
+    signed_spec_file_name: str
+    pending_action: bool
+    action_note: str
+    action_due_date: object
+    primary_contact_name: str
+    primary_contact_phone: str
+    primary_contact_email: str
+    secondary_contact_name: str
+    secondary_contact_phone: str
+    secondary_contact_email: str
+    deposit_received_date: object
+    deposit_amount: float
+    deposit_invoice_requested: bool
+    deposit_invoice_sent: bool
+
+    @classmethod
+    def from_row(cls, project: dict) -> "ProjectView":
+        return cls(**{k: (project.get(k) or d) for k, d in _DEFAULTS.items()})
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_project(project_id: str, version: int):
+    """Project bundle cache keyed on a per-project version; bumping the
+    version after a write invalidates without waiting out the TTL."""
+    return get_project_bundle(project_id)
+
+
+def _project_version(project_id: str) -> int:
+    return st.session_state.setdefault("_project_versions", {}).get(project_id, 0)
+
+
+def _bump_project_version(project_id: str):
+    """Invalidate the cached project row after a successful mutation."""
+    versions = st.session_state.setdefault("_project_versions", {})
+    versions[project_id] = versions.get(project_id, 0) + 1
+
+
+def render_project_detail():
+    """Render the Project Detail View - Matt & Bruno Loop."""
+    # Inject scroll preservation JavaScript - saves position before rerun and restores after
+    st.markdown(_SCROLL_PRESERVATION_JS, unsafe_allow_html=True)
     
     # Handle explicit scroll to top (for navigation)
-    try:
-        from streamlit_js_eval import streamlit_js_eval
-        if st.session_state.get("scroll_to_top"):
-            streamlit_js_eval(js_expressions="sessionStorage.removeItem('grayco_scroll_pos'); window.scrollTo(0, 0);", key="scroll_top")
-            st.session_state.scroll_to_top = False
-    except:
-        pass
+    if _HAS_JS_EVAL and st.session_state.get("scroll_to_top"):
+        streamlit_js_eval(js_expressions="sessionStorage.removeItem('grayco_scroll_pos'); window.scrollTo(0, 0);", key="scroll_top")
+        st.session_state.scroll_to_top = False
     
     # Render the main content
     render_project_detail_content()
@@ -62,7 +288,8 @@ def render_project_detail_content():
             st.rerun()
         return
     
-    project = get_project_by_id(project_id)
+    bundle = _cached_project(project_id, _project_version(project_id))
+    project = bundle["project"]
     
     if not project:
         st.error(f"Project not found: {project_id}")
@@ -71,69 +298,23 @@ def render_project_detail_content():
             st.rerun()
         return
     
-    client_name = project.get("client_name", "Unknown Client")
-    status = project.get("status", "pending")
-    notes = project.get("notes", "") or ""
-    estimated_value = project.get("estimated_value", 0)
-    google_drive_link = project.get("google_drive_link", "")
-    google_drive_folder_id = project.get("google_drive_folder_id", "") or ""
-    date_applied = project.get("date_applied")
-    permit_number = project.get("permit_number", "") or ""
-    permit_phone = project.get("permit_office_phone", "") or ""
-    site_address = project.get("site_address", "") or ""
-    design_proof_drive_id = project.get("design_proof_drive_id", "") or ""
-    design_proof_name = project.get("design_proof_name", "") or ""
-    proposal_drive_id = project.get("proposal_drive_id", "") or ""
-    proposal_name = project.get("proposal_name", "") or ""
-    no_design_required = project.get("no_design_required", False) or False
-    
-    master_spec_file_id = project.get("master_spec_file_id", "") or ""
-    master_spec_file_name = project.get("master_spec_file_name", "") or ""
-    master_spec_locked_at = project.get("master_spec_locked_at")
-    production_locked = project.get("production_locked", False) or False
-    signed_spec_file_id = project.get("signed_spec_file_id", "") or ""
-    signed_spec_file_name = project.get("signed_spec_file_name", "") or ""
-    
-    render_sticky_header(client_name, status, google_drive_link)
-    
-    is_in_production = production_locked or status == "ACTIVE PRODUCTION"
+    pv = ProjectView.from_row(project)
+    
+    render_sticky_header(pv.client_name, pv.status, pv.google_drive_link)
+    
+    is_in_production = pv.production_locked or pv.status == "ACTIVE PRODUCTION"
     if is_in_production:
-        st.markdown(
-            '''
-            <div style="
-                background: linear-gradient(145deg, #ff4444 0%, #cc0000 100%);
-                border-radius: 8px;
-                padding: 12px 20px;
-                margin: 0 0 16px 0;
-                text-align: center;
-            ">
-                <p style="color: white; margin: 0; font-size: 16px; font-weight: 700;">
-                    🔒 PRODUCTION LOCKED: No design changes permitted without a Change Order.
-                </p>
-            </div>
-            ''',
-            unsafe_allow_html=True
-        )
+        st.markdown(_PROD_LOCK_HTML, unsafe_allow_html=True)
     
     st.divider()
     
-    pending_action = project.get("pending_action", False) or False
-    action_note = project.get("action_note", "") or ""
-    action_due_date = project.get("action_due_date")
-    render_action_capture_box(project_id, pending_action, action_note, action_due_date)
-    
-    primary_contact_name = project.get("primary_contact_name", "") or ""
-    primary_contact_phone = project.get("primary_contact_phone", "") or ""
-    primary_contact_email = project.get("primary_contact_email", "") or ""
-    secondary_contact_name = project.get("secondary_contact_name", "") or ""
-    secondary_contact_phone = project.get("secondary_contact_phone", "") or ""
-    secondary_contact_email = project.get("secondary_contact_email", "") or ""
+    render_action_capture_box(project_id, pv.pending_action, pv.action_note, pv.action_due_date)
     
     render_project_identity_header(
-        project_id, client_name, site_address,
-        primary_contact_name, primary_contact_phone, primary_contact_email,
-        secondary_contact_name, secondary_contact_phone, secondary_contact_email,
-        status
+        project_id, pv.client_name, pv.site_address,
+        pv.primary_contact_name, pv.primary_contact_phone, pv.primary_contact_email,
+        pv.secondary_contact_name, pv.secondary_contact_phone, pv.secondary_contact_email,
+        pv.status
     )
     
     st.markdown(
@@ -141,71 +322,91 @@ def render_project_detail_content():
         unsafe_allow_html=True
     )
     
-    status_lower = (status or "").lower().replace(" ", "_").replace("-", "_")
+    status_lower = (pv.status or "").lower().replace(" ", "_").replace("-", "_")
     
     # State-aware expansion: only the relevant block opens based on status
-    expand_a = status_lower in ["migrated", "lead"]
-    expand_b = status_lower == "design"
-    expand_c = status_lower in ["quoting", "proposal", "pricing"]
-    expand_d = status_lower in ["awaiting_deposit", "awaiting", "confirmed", "approved"]
-    
-    focus_mode_statuses = ["active_production", "production", "in_production", "installed", "completed", "invoiced", "permit_pending"]
-    is_focus_mode = status_lower in focus_mode_statuses
+    active_block = _EXPAND_MAP.get(status_lower)
+    expand_a = active_block == "A"
+    expand_b = active_block == "B"
+    expand_c = active_block == "C"
+    expand_d = active_block == "D"
+    
+    is_focus_mode = status_lower in _FOCUS_MODE_STATUSES
+    
+    def _lazy_expander(label, expanded, block_key, render_fn):
+        """Only build an expander's body once it is expanded by status or the
+        user has asked for it; collapsed sections cost a single stub button."""
+        opened_key = f"block_open_{block_key}_{project_id}"
+        with st.expander(label, expanded=expanded):
+            if expanded or st.session_state.get(opened_key):
+                render_fn()
+            elif st.button("Load section", key=f"load_{opened_key}"):
+                st.session_state[opened_key] = True
+                st.rerun()
     
-    with st.expander("Block A: The Shoebox (Intake)", expanded=expand_a and not is_focus_mode):
-        render_block_a_shoebox(project_id, client_name, google_drive_folder_id, 
-                               master_spec_file_name, production_locked)
+    _lazy_expander(
+        "Block A: The Shoebox (Intake)", expand_a and not is_focus_mode, "a",
+        lambda: render_block_a_shoebox(project_id, pv.client_name, pv.google_drive_folder_id,
+                                       pv.master_spec_file_name, pv.production_locked)
+    )
     
-    with st.expander("Block B: Design Loop (Matt)", expanded=expand_b and not is_focus_mode):
-        design_uploaded = render_block_b_design_loop(project_id, client_name, notes, google_drive_link, design_proof_drive_id, design_proof_name, no_design_required, status)
+    _lazy_expander(
+        "Block B: Design Loop (Matt)", expand_b and not is_focus_mode, "b",
+        lambda: render_block_b_design_loop(project_id, pv.client_name, pv.notes, pv.google_drive_link, pv.design_proof_drive_id, pv.design_proof_name, pv.no_design_required, pv.status)
+    )
     
+    # Fragments do not return values on their isolated reruns, so Block B
+    # publishes the flag through session state for Block C to read. When B
+    # was skipped entirely, fall back to what the project row says.
+    design_uploaded = st.session_state.get(
+        f"design_uploaded_{project_id}",
+        bool(pv.design_proof_drive_id) or pv.no_design_required
+    )
     if is_focus_mode:
         design_uploaded = True
     
-    with st.expander("Block C: Pricing Loop (Bruno)", expanded=expand_c and not is_focus_mode):
-        render_block_c_pricing_loop(project_id, client_name, design_uploaded, google_drive_link, proposal_drive_id, proposal_name)
-    
-    deposit_received_date = project.get("deposit_received_date")
-    deposit_amount = project.get("deposit_amount", 0) or 0
-    deposit_invoice_requested = project.get("deposit_invoice_requested", False)
-    deposit_invoice_sent = project.get("deposit_invoice_sent", False)
-    estimated_value = project.get("estimated_value", 0) or 0
+    _lazy_expander(
+        "Block C: Pricing Loop (Bruno)", expand_c and not is_focus_mode, "c",
+        lambda: render_block_c_pricing_loop(project_id, pv.client_name, design_uploaded, pv.google_drive_link, pv.proposal_drive_id, pv.proposal_name)
+    )
     
-    with st.expander("💵 Block D: Deposit & Handoff", expanded=expand_d and not is_focus_mode):
+    def _render_block_d():
         render_block_d_deposit_handoff(
-            project_id, client_name, status, 
-            deposit_invoice_requested, deposit_invoice_sent, 
-            deposit_received_date, deposit_amount,
-            google_drive_link, estimated_value,
-            master_spec_file_id, master_spec_file_name,
-            signed_spec_file_id, signed_spec_file_name,
-            production_locked
+            project_id, pv.client_name, pv.status, 
+            pv.deposit_invoice_requested, pv.deposit_invoice_sent, 
+            pv.deposit_received_date, pv.deposit_amount,
+            pv.google_drive_link, pv.estimated_value,
+            pv.master_spec_file_id, pv.master_spec_file_name,
+            pv.signed_spec_file_id, pv.signed_spec_file_name,
+            pv.production_locked
         )
-        render_project_decision(project_id, client_name, status, deposit_received_date)
+        render_project_decision(project_id, pv.client_name, pv.status, pv.deposit_received_date)
+    
+    _lazy_expander("💵 Block D: Deposit & Handoff", expand_d and not is_focus_mode, "d", _render_block_d)
     
     render_block_e_production_logistics(
-        project_id, client_name, status, deposit_received_date
+        project_id, pv.client_name, pv.status, pv.deposit_received_date
     )
     
     render_block_f_installation_prep(
-        project_id, client_name, status, google_drive_link
+        project_id, pv.client_name, pv.status, pv.google_drive_link
     )
     
     render_block_g_project_closeout(
-        project_id, client_name, status
+        project_id, pv.client_name, pv.status
     )
     
-    # Project History at the very bottom in collapsed expander
-    with st.expander("📜 Project History", expanded=False):
-        render_project_history(project_id)
+    # Project History at the very bottom in collapsed expander; its query
+    # only runs once the user asks for it.
+    _lazy_expander("📜 Project History", False, "history",
+                   lambda: render_project_history(project_id, bundle["touches"]))
     
-    render_project_footer(project_id, client_name, status)
+    render_project_footer(project_id, pv.client_name, pv.status)
 
 
+@st.fragment
 def render_project_footer(project_id: str, client_name: str, status: str):
     """Render the project footer with archive/restore and delete options."""
-    from services.database_manager import archive_project, restore_project
-    
     is_archived = status.lower() == "archived"
     
     st.markdown("<br><br>", unsafe_allow_html=True)
@@ -228,6 +429,7 @@ def render_project_footer(project_id: str, client_name: str, status: str):
         with col1:
             if st.button("♻️ Restore to Active", key=f"restore_btn_{project_id}", type="primary"):
                 if restore_project(project_id):
+                    _bump_project_version(project_id)
                     st.toast("Restored to Block A", icon="✅")
                     st.rerun()
                 else:
@@ -267,6 +469,7 @@ def render_project_footer(project_id: str, client_name: str, status: str):
         with col1:
             if st.button("📁 Move to Cold Storage", key=f"archive_btn_{project_id}"):
                 if archive_project(project_id):
+                    _bump_project_version(project_id)
                     st.toast("Moved to Cold Storage", icon="✅")
                     st.session_state.page = "Dashboard"
                     st.rerun()
@@ -285,14 +488,9 @@ def render_sticky_header(client_name: str, status: str, google_drive_link: str):
     
     with col1:
         st.markdown(
-            f'''
-            <div style="padding: 10px 0;">
-                <h1 style="color: #E5E5E5; margin: 0; font-size: 28px;">{client_name}</h1>
-                <p style="color: #00A8E8; margin: 4px 0 0 0; font-size: 14px;">
-                    Status: {status} {get_status_badge(status)}
-                </p>
-            </div>
-            ''',
+            _STICKY_HEADER_TMPL.safe_substitute(
+                client_name=client_name, status=status, badge=get_status_badge(status)
+            ),
             unsafe_allow_html=True
         )
     
@@ -316,10 +514,9 @@ def render_sticky_header(client_name: str, status: str, google_drive_link: str):
             st.rerun()
 
 
+@st.fragment
 def render_action_capture_box(project_id: str, pending_action: bool, action_note: str, action_due_date=None):
     """Render compact Action Capture box with inline due date and standard mic icon."""
-    from components.icons import get_icon
-    
     KB_CARD_BG = "#111111"
     KB_BORDER = "#222222"
     KB_TEXT = "#E5E5E5"
@@ -359,10 +556,17 @@ def render_action_capture_box(project_id: str, pending_action: bool, action_note
             if isinstance(action_due_date, date):
                 current_due = action_due_date
             else:
-                try:
-                    current_due = datetime.fromisoformat(str(action_due_date).replace('Z', '+00:00')).date()
-                except:
-                    pass
+                # Parse once per raw value; unparseable strings cache None so
+                # they are not retried on every rerun.
+                parse_key = f"parsed_due_{project_id}_{action_due_date}"
+                if parse_key in st.session_state:
+                    current_due = st.session_state[parse_key]
+                else:
+                    try:
+                        current_due = datetime.fromisoformat(str(action_due_date).replace('Z', '+00:00')).date()
+                    except:
+                        current_due = None
+                    st.session_state[parse_key] = current_due
         
         col_date, col_save = st.columns([1, 1])
         
@@ -384,12 +588,16 @@ def render_action_capture_box(project_id: str, pending_action: bool, action_note
                 if update_action_status(project_id, auto_pending_action, new_action_note, due_date_to_save):
                     if auto_pending_action and new_action_note:
                         add_project_history(project_id, "ACTION_LOG", f"[ACTION LOG] {new_action_note}")
+                    _bump_project_version(project_id)
                     st.toast("Saved", icon="✅")
-                    st.rerun()
+                    # Action state lives entirely in this box; no need to
+                    # re-run the whole page after the version bump.
+                    st.rerun(scope="fragment")
                 else:
                     st.error("Failed to save action status")
 
 
+@st.fragment
 def render_project_identity_header(project_id: str, client_name: str, site_address: str,
                                    primary_contact_name: str, primary_contact_phone: str, primary_contact_email: str,
                                    secondary_contact_name: str, secondary_contact_phone: str, secondary_contact_email: str,
@@ -397,25 +605,10 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
     """Render the editable Project Identity header with contacts, Google Maps link, and Global Escape Hatch."""
     
     status_lower = (status or "").lower().replace(" ", "_")
-    show_lost_button = status_lower not in ['closed_-_won', 'closed_-_lost', 'completed', 'archived']
+    show_lost_button = status_lower not in _LOST_HIDDEN_STATUSES
     
     with st.expander("📋 Project Identity", expanded=True):
-        st.markdown(
-            '''
-            <div style="
-                background: linear-gradient(145deg, #1a2a3a 0%, #0d1b2a 100%);
-                border-radius: 12px;
-                padding: 16px;
-                margin-bottom: 16px;
-                border: 1px solid #00A8E8;
-            ">
-                <p style="color: #00A8E8; font-size: 13px; margin: 0; font-weight: 600;">
-                    🏢 Project Details & Contact Information
-                </p>
-            </div>
-            ''',
-            unsafe_allow_html=True
-        )
+        st.markdown(_IDENTITY_CARD_HTML, unsafe_allow_html=True)
         
         col1, col2 = st.columns(2)
         
@@ -436,7 +629,7 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
             )
         
         if new_site_address:
-            maps_url = f"https://www.google.com/maps/search/?api=1&query={new_site_address.replace(' ', '+')}"
+            maps_url = f"https://www.google.com/maps/search/?api=1&query={quote_plus(new_site_address)}"
             st.markdown(
                 f'''
                 <a href="{maps_url}" target="_blank" style="
@@ -476,12 +669,6 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
                 key=f"identity_primary_phone_{project_id}",
                 placeholder="(555) 123-4567"
             )
-            if new_primary_phone:
-                clean_phone = ''.join(filter(str.isdigit, new_primary_phone))
-                st.markdown(
-                    f'<a href="tel:{clean_phone}" style="color: #00A8E8; font-size: 12px;">📞 Call</a>',
-                    unsafe_allow_html=True
-                )
         
         with p_col3:
             new_primary_email = st.text_input(
@@ -490,11 +677,17 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
                 key=f"identity_primary_email_{project_id}",
                 placeholder="email@example.com"
             )
-            if new_primary_email:
-                st.markdown(
-                    f'<a href="mailto:{new_primary_email}" style="color: #00A8E8; font-size: 12px;">✉️ Email</a>',
-                    unsafe_allow_html=True
-                )
+        
+        # Both quick links go out in one markdown element instead of one per
+        # column.
+        primary_links = []
+        if new_primary_phone:
+            clean_phone = _NON_DIGIT_RE.sub("", new_primary_phone)
+            primary_links.append(f'<a href="tel:{clean_phone}" style="color: #00A8E8; font-size: 12px;">📞 Call</a>')
+        if new_primary_email:
+            primary_links.append(f'<a href="mailto:{new_primary_email}" style="color: #00A8E8; font-size: 12px;">✉️ Email</a>')
+        if primary_links:
+            st.markdown(_CONTACT_LINKS_TMPL.format(links="".join(primary_links)), unsafe_allow_html=True)
         
         st.markdown(
             '<p style="color: #888; font-size: 13px; font-weight: 600; margin: 16px 0 8px 0;">👥 Secondary Contact (Optional)</p>',
@@ -518,12 +711,6 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
                 key=f"identity_secondary_phone_{project_id}",
                 placeholder="(555) 123-4567"
             )
-            if new_secondary_phone:
-                clean_phone = ''.join(filter(str.isdigit, new_secondary_phone))
-                st.markdown(
-                    f'<a href="tel:{clean_phone}" style="color: #888; font-size: 12px;">📞 Call</a>',
-                    unsafe_allow_html=True
-                )
         
         with s_col3:
             new_secondary_email = st.text_input(
@@ -532,11 +719,15 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
                 key=f"identity_secondary_email_{project_id}",
                 placeholder="email@example.com"
             )
-            if new_secondary_email:
-                st.markdown(
-                    f'<a href="mailto:{new_secondary_email}" style="color: #888; font-size: 12px;">✉️ Email</a>',
-                    unsafe_allow_html=True
-                )
+        
+        secondary_links = []
+        if new_secondary_phone:
+            clean_phone = _NON_DIGIT_RE.sub("", new_secondary_phone)
+            secondary_links.append(f'<a href="tel:{clean_phone}" style="color: #888; font-size: 12px;">📞 Call</a>')
+        if new_secondary_email:
+            secondary_links.append(f'<a href="mailto:{new_secondary_email}" style="color: #888; font-size: 12px;">✉️ Email</a>')
+        if secondary_links:
+            st.markdown(_CONTACT_LINKS_TMPL.format(links="".join(secondary_links)), unsafe_allow_html=True)
         
         st.markdown("<div style='height: 8px;'></div>", unsafe_allow_html=True)
         
@@ -546,27 +737,17 @@ def render_project_identity_header(project_id: str, client_name: str, site_addre
                 new_primary_name, new_primary_phone, new_primary_email,
                 new_secondary_name, new_secondary_phone, new_secondary_email
             ):
+                _bump_project_version(project_id)
                 st.success("Project identity saved!")
-                st.rerun()
+                # The edited fields render inside this fragment; the sticky
+                # header picks up the bumped version on the next full run.
+                st.rerun(scope="fragment")
             else:
                 st.error("Failed to save project identity")
         
         if show_lost_button:
             st.markdown("<div style='height: 12px;'></div>", unsafe_allow_html=True)
-            st.markdown(
-                '''
-                <style>
-                    div[data-testid="stButton"] button[kind="secondary"][data-testid*="escape_hatch"] {
-                        border: 1px solid #ff4444 !important;
-                        color: #ff6666 !important;
-                        background: transparent !important;
-                        font-size: 12px !important;
-                        padding: 4px 12px !important;
-                    }
-                </style>
-                ''',
-                unsafe_allow_html=True
-            )
+            st.markdown(_ESCAPE_HATCH_STYLE, unsafe_allow_html=True)
             col_spacer, col_lost = st.columns([3, 1])
             with col_lost:
                 if st.button("❌ Project Lost", key=f"escape_hatch_lost_{project_id}", use_container_width=True):
@@ -583,7 +764,6 @@ def render_voice_dictation_modal(project_id: str, voice_key: str):
     - Console logs for debugging
     """
     import streamlit.components.v1 as components
-    from streamlit_js_eval import streamlit_js_eval
     import json
     
     modal_voice_key = f"modal_{project_id}"
@@ -626,60 +806,25 @@ def render_voice_dictation_modal(project_id: str, voice_key: str):
     )
     
     if is_recording:
-        # Show recording indicator with pulsing animation
-        components.html(f"""
-        <style>
-            @keyframes pulse {{ 0%,100% {{ opacity:1; transform:scale(1); }} 50% {{ opacity:0.7; transform:scale(1.05); }} }}
-            .rec-box {{ color:#e74c3c; font-size:18px; animation:pulse 1s infinite; padding:20px; background:linear-gradient(145deg, #2a0a0a 0%, #1a0505 100%); border-radius:12px; border:2px solid #e74c3c; text-align:center; margin:10px 0; }}
-        </style>
-        <div class="rec-box">🔴 Listening... Speak now!</div>
-        <script>
-        (function() {{
-            console.log('[VoiceDictation] Starting modal recognition for: {voice_key}');
-            const SR = window.SpeechRecognition || window.webkitSpeechRecognition;
-            if (!SR) {{ console.error('[VoiceDictation] Not supported'); sessionStorage.setItem('vd_error_{modal_voice_key}','not_supported'); return; }}
-            const r = new SR();
-            r.lang = 'en-US';
-            r.interimResults = false;
-            r.maxAlternatives = 1;
-            r.onstart = () => console.log('[VoiceDictation] Modal started');
-            r.onresult = (e) => {{
-                const t = e.results[0][0].transcript;
-                console.log('[VoiceDictation] Modal result:', t, 'Confidence:', e.results[0][0].confidence);
-                sessionStorage.setItem('vd_result_{modal_voice_key}', t);
-            }};
-            r.onerror = (e) => {{
-                console.error('[VoiceDictation] Modal error:', e.error);
-                sessionStorage.setItem('vd_error_{modal_voice_key}', e.error);
-            }};
-            r.onend = () => {{
-                console.log('[VoiceDictation] Modal ended');
-                sessionStorage.setItem('vd_ended_{modal_voice_key}', 'true');
-            }};
-            try {{ r.start(); }} catch(e) {{ console.error('[VoiceDictation] Modal start failed:', e); }}
-        }})();
-        </script>
-        """, height=80)
+        # Pure-CSS recording indicator; recognition itself runs in the
+        # promise below, so this iframe carries no script. The payload is a
+        # module constant, so Streamlit sees the same component value on
+        # every rerun while recording and skips remounting the iframe.
+        components.html(_REC_INDICATOR_HTML, height=80)
         
-        # Poll for result
+        # One promise that resolves when recognition finishes — a single JS
+        # hop and one rerun per dictation instead of a timestamp-keyed poll
+        # loop. The nonce keys each recording session so a finished promise
+        # value is never replayed into the next recording.
+        nonce = st.session_state.get(f"rec_nonce_{project_id}", 0)
         try:
-            poll_result = streamlit_js_eval(
-                js_expressions=f"""
-                (function() {{
-                    const r = sessionStorage.getItem('vd_result_{modal_voice_key}');
-                    const e = sessionStorage.getItem('vd_error_{modal_voice_key}');
-                    const ended = sessionStorage.getItem('vd_ended_{modal_voice_key}');
-                    if (r) {{ sessionStorage.removeItem('vd_result_{modal_voice_key}'); sessionStorage.removeItem('vd_ended_{modal_voice_key}'); return JSON.stringify({{type:'result',value:r}}); }}
-                    if (e) {{ sessionStorage.removeItem('vd_error_{modal_voice_key}'); sessionStorage.removeItem('vd_ended_{modal_voice_key}'); return JSON.stringify({{type:'error',value:e}}); }}
-                    if (ended === 'true') {{ sessionStorage.removeItem('vd_ended_{modal_voice_key}'); return JSON.stringify({{type:'no_result'}}); }}
-                    return null;
-                }})()
-                """,
-                key=f"poll_{modal_voice_key}_{datetime.now().timestamp()}"
+            promise_result = streamlit_js_eval(
+                js_expressions=_VOICE_PROMISE_JS.substitute(voice_key=voice_key),
+                key=f"voice_promise_{modal_voice_key}_{nonce}"
             )
             
-            if poll_result:
-                data = json.loads(poll_result)
+            if promise_result:
+                data = json.loads(promise_result)
                 if data.get('type') == 'result':
                     st.session_state[result_key] = data['value']
                     st.session_state[recording_key] = False
@@ -693,7 +838,7 @@ def render_voice_dictation_modal(project_id: str, voice_key: str):
                     st.warning("No speech detected. Please try again.")
                     st.rerun()
         except Exception as e:
-            print(f"[VoiceDictation] Modal poll error: {e}")
+            print(f"[VoiceDictation] Modal recognition error: {e}")
         
         if st.button("⏹️ Stop Recording", use_container_width=True, key=f"stop_modal_{project_id}"):
             st.session_state[recording_key] = False
@@ -701,6 +846,7 @@ def render_voice_dictation_modal(project_id: str, voice_key: str):
     else:
         if st.button("🔴 Start Recording", type="primary", use_container_width=True, key=f"start_modal_{project_id}"):
             st.session_state[recording_key] = True
+            st.session_state[f"rec_nonce_{project_id}"] = st.session_state.get(f"rec_nonce_{project_id}", 0) + 1
             st.rerun()
     
     st.markdown("<div style='margin-top: 16px;'></div>", unsafe_allow_html=True)
@@ -721,9 +867,21 @@ def render_voice_dictation_modal(project_id: str, voice_key: str):
 
 def get_browser_gps(project_id: str):
     """Get GPS coordinates from browser using streamlit-js-eval with async geolocation."""
+    if not _HAS_JS_EVAL:
+        return None
+    
+    # The js_eval round-trip costs a browser hop on every rerun, so a
+    # resolved fix is cached per session (the Refresh GPS button evicts
+    # it). The component returns None on its first mount before the
+    # geolocation promise settles, so only real coordinates are cached —
+    # anything falsy keeps the component mounted on later reruns until
+    # the browser delivers a value.
+    cache_key = f"_gps_cache_{project_id}"
+    cached = st.session_state.get(cache_key)
+    if cached:
+        return cached
+    
     try:
-        from streamlit_js_eval import streamlit_js_eval
-        
         gps_js = """
         new Promise((resolve) => {
             const cached = sessionStorage.getItem('gps_coords');
@@ -754,7 +912,10 @@ def get_browser_gps(project_id: str):
         """
         
         result = streamlit_js_eval(js_expressions=gps_js, key=f"gps_capture_{project_id}")
-        return result if result else ""
+        if result:
+            st.session_state[cache_key] = result
+            return result
+        return ""
     except Exception:
         return ""
 
@@ -795,16 +956,44 @@ def render_gps_status(gps_coords: str):
         )
 
 
+@lru_cache(maxsize=8)
+def _get_watermark_font(path: str, size: int):
+    """Load a watermark font once per (path, size); parsing the TTF from
+    disk for every photo dominates batch saves otherwise."""
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=32)
+def _render_watermark_tile(watermark_text: str):
+    """Rasterize a watermark text block once into a transparent RGBA tile.
+
+    Photos saved in one batch share the same minute-level timestamp and GPS
+    string, so the FreeType work happens once per distinct text and every
+    subsequent photo just alpha-pastes the tile.
+    """
+    font = _get_watermark_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 14)
+    probe = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    bbox = probe.multiline_textbbox((0, 0), watermark_text, font=font, spacing=4, stroke_width=2)
+    tile = Image.new('RGBA', (bbox[2] - bbox[0] + 2, bbox[3] - bbox[1] + 2), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).multiline_text(
+        (1 - bbox[0], 1 - bbox[1]), watermark_text, font=font,
+        fill="#FFFFFF", stroke_width=2, stroke_fill="#000000", spacing=4
+    )
+    return tile
+
+
 def add_watermark_to_image(img_bytes: bytes, gps_coords: str = None) -> bytes:
     """Add high-contrast timestamp/GPS watermark to image (white text, black outline)."""
-    import datetime
-    
     img = Image.open(io.BytesIO(img_bytes))
+    # Let libjpeg downscale 4K+ phone photos in the DCT domain during
+    # decode; a no-op for images already at or below the target size.
+    img.draft('RGB', (2048, 2048))
     if img.mode != 'RGB':
         img = img.convert('RGB')
     
-    draw = ImageDraw.Draw(img)
-    
     now = now_mountain()
     display_time = now.strftime("%b %d, %Y - %I:%M %p") + " MT"
     
@@ -813,50 +1002,75 @@ def add_watermark_to_image(img_bytes: bytes, gps_coords: str = None) -> bytes:
     else:
         watermark_text = display_time
     
+    # Identical text across a batch hits the cached tile, so only the
+    # first photo pays for glyph rasterization.
     try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 14)
+        tile = _render_watermark_tile(watermark_text)
+        max_width, total_height = tile.size
     except:
-        font = ImageFont.load_default()
-    
-    lines = watermark_text.split('\n')
-    max_width = 0
-    total_height = 0
-    for line in lines:
-        try:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            max_width = max(max_width, bbox[2] - bbox[0])
-            total_height += bbox[3] - bbox[1] + 4
-        except:
-            max_width = max(max_width, len(line) * 9)
-            total_height += 18
+        tile = None
+        lines = watermark_text.split('\n')
+        max_width = max(len(line) * 9 for line in lines)
+        total_height = 18 * len(lines)
     
     padding = 8
     box_x = img.width - max_width - padding * 2 - 10
     box_y = img.height - total_height - padding * 2 - 10
     
-    text_y = box_y + padding
-    for line in lines:
-        text_x = box_x + padding
-        for dx in [-2, -1, 0, 1, 2]:
-            for dy in [-2, -1, 0, 1, 2]:
-                if dx != 0 or dy != 0:
-                    draw.text((text_x + dx, text_y + dy), line, font=font, fill="#000000")
-        draw.text((text_x, text_y), line, font=font, fill="#FFFFFF")
-        text_y += 18
+    if tile is not None:
+        img.paste(tile, (box_x + padding, box_y + padding), tile)
+    else:
+        font = _get_watermark_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 14)
+        ImageDraw.Draw(img).multiline_text(
+            (box_x + padding, box_y + padding), watermark_text, font=font,
+            fill="#FFFFFF", stroke_width=2, stroke_fill="#000000", spacing=4
+        )
     
     buf = io.BytesIO()
-    img.save(buf, format='JPEG', quality=95)
+    img.save(buf, format='JPEG', quality=85, optimize=True, progressive=True)
     buf.seek(0)
     return buf.getvalue()
 
 
+def _infer_intake_category(filename: str) -> str:
+    """Guess an intake category from the filename; the user can override."""
+    name = filename.lower()
+    if "logo" in name or name.endswith((".svg", ".pdf")):
+        return "logo"
+    if "ref" in name or "inspo" in name:
+        return "reference"
+    return "site"
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_photos_by_categories(project_id: str):
+    """Photo payloads are megabytes; without this every widget click
+    re-fetched them all. Cleared explicitly after every save/delete.
+
+    file_data arrives from the driver as memoryview, which cache_data
+    cannot pickle — convert to bytes once here, which also means every
+    consumer downstream sees plain bytes."""
+    photos_by_cat = get_photos_by_categories(project_id)
+    for photos in photos_by_cat.values():
+        for photo in photos:
+            if isinstance(photo.get("file_data"), memoryview):
+                photo["file_data"] = bytes(photo["file_data"])
+    return photos_by_cat
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_fuzzy_folder(client_name: str):
+    """Fuzzy Drive folder lookup, cached so an open Auto-Find panel does
+    not hit the Drive API again on every unrelated rerun. Returns the
+    (folder, err) pair from find_drive_folder_fuzzy."""
+    access_token, err = get_drive_access_token()
+    if err:
+        return None, err
+    return find_drive_folder_fuzzy(access_token, client_name)
+
+
 def render_folder_linker(project_id: str, client_name: str):
     """Render folder linker when no Drive folder is connected."""
-    from views.migration_util import (
-        get_drive_access_token, find_drive_folder_fuzzy, 
-        update_project_drive_folder, extract_folder_id_from_url
-    )
-    
     st.markdown(
         '''
         <div style="
@@ -891,32 +1105,32 @@ def render_folder_linker(project_id: str, client_name: str):
     
     if st.session_state.get(fuzzy_key, False):
         with st.spinner("Searching for matching folder..."):
-            access_token, err = get_drive_access_token()
+            folder, err = _cached_fuzzy_folder(client_name)
             if err:
                 st.error(f"Drive not connected: {err}")
-            else:
-                folder, err = find_drive_folder_fuzzy(access_token, client_name)
-                if folder:
-                    folder_name = folder.get("name", "Unknown")
-                    folder_id = folder.get("id")
-                    folder_link = folder.get("webViewLink", "")
-                    
-                    st.success(f"Found matching folder: **{folder_name}**")
-                    
-                    if st.button("✅ Link This Folder", key=f"confirm_link_{project_id}", type="primary"):
-                        success, err = update_project_drive_folder(project_id, folder_id, folder_link)
-                        if success:
-                            st.session_state[fuzzy_key] = False
-                            st.rerun()
-                        else:
-                            st.error(f"Failed to link: {err}")
-                    
-                    if st.button("Cancel", key=f"cancel_fuzzy_{project_id}"):
+            elif folder:
+                folder_name = folder.get("name", "Unknown")
+                folder_id = folder.get("id")
+                folder_link = folder.get("webViewLink", "")
+                
+                st.success(f"Found matching folder: **{folder_name}**")
+                
+                if st.button("✅ Link This Folder", key=f"confirm_link_{project_id}", type="primary"):
+                    success, err = update_project_drive_folder(project_id, folder_id, folder_link)
+                    if success:
                         st.session_state[fuzzy_key] = False
+                        _cached_fuzzy_folder.clear()
                         st.rerun()
-                else:
-                    st.warning("No matching folder found. Try manual linking instead.")
+                    else:
+                        st.error(f"Failed to link: {err}")
+                
+                if st.button("Cancel", key=f"cancel_fuzzy_{project_id}"):
                     st.session_state[fuzzy_key] = False
+                    _cached_fuzzy_folder.clear()
+                    st.rerun()
+            else:
+                st.warning("No matching folder found. Try manual linking instead.")
+                st.session_state[fuzzy_key] = False
     
     if st.session_state.get(manual_key, False):
         st.markdown('<p style="color: #FFFFFF; font-size: 13px;">Paste a Google Drive folder URL:</p>', unsafe_allow_html=True)
@@ -952,14 +1166,10 @@ def render_folder_linker(project_id: str, client_name: str):
                 st.rerun()
 
 
+@st.fragment
 def render_block_a_shoebox(project_id: str, client_name: str, drive_folder_id: str = None,
                            master_spec_file_name: str = None, production_locked: bool = False):
     """Block A: The Shoebox - Tri-Category Photo Intake with Zero-Input GPS and Master Spec pinning."""
-    from services.database_manager import (
-        get_photos_by_categories, save_project_photo, delete_project_photo, get_next_photo_index
-    )
-    import datetime
-    
     if production_locked and master_spec_file_name:
         st.markdown(
             f'''
@@ -1021,6 +1231,7 @@ def render_block_a_shoebox(project_id: str, client_name: str, drive_folder_id: s
     with gps_col2:
         if st.button("🔄 Refresh GPS", key=f"refresh_gps_{project_id}", use_container_width=True):
             st.session_state[gps_attempted_key] = True
+            st.session_state.pop(f"_gps_cache_{project_id}", None)
             st.rerun()
     
     with st.expander("📍 Manual GPS Override", expanded=False):
@@ -1100,90 +1311,103 @@ def render_block_a_shoebox(project_id: str, client_name: str, drive_folder_id: s
     
     st.markdown("<hr style='border: none; border-top: 1px solid #333; margin: 16px 0;'>", unsafe_allow_html=True)
     
-    upload_col1, upload_col2, upload_col3 = st.columns(3)
+    st.markdown('<p style="color: #00A8E8; font-size: 14px; font-weight: 600;">📥 Intake Files (site photos, logos, reference/inspo)</p>', unsafe_allow_html=True)
+    intake_files = st.file_uploader(
+        "Upload intake files",
+        type=["jpg", "jpeg", "png", "svg", "pdf"],
+        accept_multiple_files=True,
+        key=f"intake_upload_{project_id}",
+        label_visibility="collapsed"
+    )
     
-    with upload_col1:
-        st.markdown('<p style="color: #00A8E8; font-size: 14px; font-weight: 600;">📷 Site Photo</p>', unsafe_allow_html=True)
-        site_files = st.file_uploader(
-            "Upload site photos",
-            type=["jpg", "jpeg", "png"],
-            accept_multiple_files=True,
-            key=f"site_upload_{project_id}",
-            label_visibility="collapsed"
-        )
-        if site_files:
-            save_proceed_key = f"save_proceed_{project_id}"
-            
-            if not gps_coords and not st.session_state.get(save_proceed_key, False):
-                st.warning("⚠️ GPS not captured yet. Click 'Refresh GPS' or proceed without GPS.")
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    if st.button("🔄 Retry GPS", key=f"retry_gps_save_{project_id}", use_container_width=True):
-                        st.rerun()
-                with col_b:
-                    if st.button("💾 Save without GPS", key=f"save_no_gps_{project_id}", use_container_width=True):
-                        st.session_state[save_proceed_key] = True
-                        st.rerun()
+    site_files = []
+    logo_files = []
+    ref_files = []
+    if intake_files:
+        # One uploader instead of three; the category defaults from the
+        # filename and can be corrected per file before saving.
+        buckets = {"site": site_files, "logo": logo_files, "reference": ref_files}
+        for file in intake_files:
+            # SVG/PDF uploads can't go through the raster watermark path,
+            # so they only offer the logo/reference categories. Keyed on
+            # file_id rather than name so two uploads sharing a filename
+            # don't collide.
+            ext = file.name.rsplit('.', 1)[-1].lower() if '.' in file.name else ''
+            if ext in ("jpg", "jpeg", "png"):
+                options = ["site", "logo", "reference"]
             else:
-                if st.button("💾 Save Site Photos", key=f"save_site_{project_id}", use_container_width=True, type="primary"):
-                    saved_count = 0
-                    import time
-                    for idx, file in enumerate(site_files):
-                        timestamp = get_file_timestamp_mountain()
-                        filename = f"{safe_name}_Site_{timestamp}.jpg"
-                        img_bytes = file.read()
-                        watermarked = add_watermark_to_image(img_bytes, gps_coords)
-                        if save_project_photo(project_id, filename, watermarked, "site"):
-                            saved_count += 1
-                        time.sleep(1)
-                    if saved_count > 0:
-                        st.success(f"✅ Saved {saved_count} site photo(s)")
-                        st.session_state[save_proceed_key] = False
-                        st.rerun()
-    
-    with upload_col2:
-        st.markdown('<p style="color: #00A8E8; font-size: 14px; font-weight: 600;">🎨 Client Logo</p>', unsafe_allow_html=True)
-        logo_files = st.file_uploader(
-            "Upload client logos",
-            type=["jpg", "jpeg", "png", "svg", "pdf"],
-            accept_multiple_files=True,
-            key=f"logo_upload_{project_id}",
-            label_visibility="collapsed"
-        )
-        if logo_files:
-            if st.button("💾 Save Logos", key=f"save_logo_{project_id}", use_container_width=True, type="primary"):
-                saved_count = 0
-                for file in logo_files:
-                    next_idx = get_next_photo_index(project_id, "logo") + saved_count
-                    ext = file.name.split('.')[-1].lower() if '.' in file.name else 'jpg'
-                    filename = f"{safe_name}_Logo_{next_idx}.{ext}"
-                    img_bytes = file.read()
-                    if save_project_photo(project_id, filename, img_bytes, "logo"):
-                        saved_count += 1
-                if saved_count > 0:
-                    st.success(f"✅ Saved {saved_count} logo(s)")
+                options = ["logo", "reference"]
+            default = _infer_intake_category(file.name)
+            if default not in options:
+                default = "logo"
+            
+            cat_col, name_col = st.columns([1, 3])
+            with cat_col:
+                category = st.selectbox(
+                    "Category",
+                    options,
+                    index=options.index(default),
+                    format_func=lambda c: {"site": "📷 Site", "logo": "🎨 Logo", "reference": "💡 Ref"}[c],
+                    key=f"intake_cat_{project_id}_{file.file_id}",
+                    label_visibility="collapsed"
+                )
+            with name_col:
+                st.markdown(f'<p style="color: #E5E5E5; font-size: 13px; margin: 8px 0 0 0;">{file.name}</p>', unsafe_allow_html=True)
+            buckets[category].append(file)
+        
+        save_proceed_key = f"save_proceed_{project_id}"
+        
+        if site_files and not gps_coords and not st.session_state.get(save_proceed_key, False):
+            st.warning("⚠️ GPS not captured yet. Click 'Refresh GPS' or proceed without GPS.")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("🔄 Retry GPS", key=f"retry_gps_save_{project_id}", use_container_width=True):
                     st.rerun()
-    
-    with upload_col3:
-        st.markdown('<p style="color: #00A8E8; font-size: 14px; font-weight: 600;">💡 Reference/Inspo</p>', unsafe_allow_html=True)
-        ref_files = st.file_uploader(
-            "Upload reference images",
-            type=["jpg", "jpeg", "png"],
-            accept_multiple_files=True,
-            key=f"ref_upload_{project_id}",
-            label_visibility="collapsed"
-        )
-        if ref_files:
-            if st.button("💾 Save References", key=f"save_ref_{project_id}", use_container_width=True, type="primary"):
-                saved_count = 0
-                for file in ref_files:
-                    next_idx = get_next_photo_index(project_id, "reference") + saved_count
-                    filename = f"{safe_name}_Ref_{next_idx}.jpg"
-                    img_bytes = file.read()
-                    if save_project_photo(project_id, filename, img_bytes, "reference"):
-                        saved_count += 1
+            with col_b:
+                if st.button("💾 Save without GPS", key=f"save_no_gps_{project_id}", use_container_width=True):
+                    st.session_state[save_proceed_key] = True
+                    st.rerun()
+        else:
+            if st.button("💾 Save Intake Files", key=f"save_intake_{project_id}", use_container_width=True, type="primary"):
+                batch = []
+                
+                if site_files:
+                    # One timestamp plus a per-batch counter keeps filenames
+                    # unique without sleeping a second between saves. Pillow
+                    # releases the GIL around JPEG decode/encode, so
+                    # watermarking overlaps across files; getvalue() reuses
+                    # the uploader's buffer (and survives reruns, unlike
+                    # read()).
+                    timestamp = get_file_timestamp_mountain()
+                    with ThreadPoolExecutor(max_workers=min(4, len(site_files))) as pool:
+                        watermarked_list = list(pool.map(
+                            lambda f: add_watermark_to_image(f.getvalue(), gps_coords),
+                            site_files
+                        ))
+                    batch.extend(
+                        (f"{safe_name}_Site_{timestamp}_{idx:03d}.jpg", watermarked, "site")
+                        for idx, watermarked in enumerate(watermarked_list)
+                    )
+                
+                if logo_files:
+                    start_idx = get_next_photo_index(project_id, "logo")
+                    for offset, file in enumerate(logo_files):
+                        ext = file.name.split('.')[-1].lower() if '.' in file.name else 'jpg'
+                        filename = f"{safe_name}_Logo_{start_idx + offset}.{ext}"
+                        batch.append((filename, memoryview(file.getvalue()), "logo"))
+                
+                if ref_files:
+                    start_idx = get_next_photo_index(project_id, "reference")
+                    batch.extend(
+                        (f"{safe_name}_Ref_{start_idx + offset}.jpg", memoryview(file.getvalue()), "reference")
+                        for offset, file in enumerate(ref_files)
+                    )
+                
+                saved_count = save_project_photos(project_id, batch)
                 if saved_count > 0:
-                    st.success(f"✅ Saved {saved_count} reference(s)")
+                    st.success(f"✅ Saved {saved_count} file(s)")
+                    st.session_state[save_proceed_key] = False
+                    _cached_photos_by_categories.clear()
                     st.rerun()
     
     st.markdown("<br>", unsafe_allow_html=True)
@@ -1194,7 +1418,7 @@ def render_block_a_shoebox(project_id: str, client_name: str, drive_folder_id: s
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    photos_by_cat = get_photos_by_categories(project_id)
+    photos_by_cat = _cached_photos_by_categories(project_id)
     
     site_photos = photos_by_cat.get("site", []) + photos_by_cat.get("markup", [])
     if site_photos:
@@ -1257,21 +1481,33 @@ def render_block_a_shoebox(project_id: str, client_name: str, drive_folder_id: s
         )
     
     if drive_folder_id:
-        from views.migration_util import render_legacy_thumbnails, render_legacy_pdfs
+        prefetch_legacy_listings(drive_folder_id)
         render_legacy_thumbnails(project_id, drive_folder_id)
         render_legacy_pdfs(project_id, drive_folder_id)
     else:
         render_folder_linker(project_id, client_name)
 
 
+@st.cache_data(max_entries=512, show_spinner=False)
+def _gallery_thumb(photo_id, created_at, _photo_bytes) -> bytes:
+    """Downscale a stored photo for grid display. Keyed on the photo's id
+    and created_at (upserts bump created_at) so the multi-megabyte bytes
+    themselves are never hashed."""
+    im = Image.open(io.BytesIO(_photo_bytes))
+    im.thumbnail((400, 400), Image.Resampling.BILINEAR)
+    out = io.BytesIO()
+    im.save(out, format='JPEG', quality=75, optimize=True)
+    return out.getvalue()
+
+
 def render_photo_gallery(photos: list, category: str, project_id: str, drive_folder_id: str = None):
     """Render a photo gallery with download, archive, and delete buttons."""
-    from services.database_manager import delete_project_photo
-    
     cols = st.columns(3)
     for idx, photo in enumerate(photos):
         with cols[idx % 3]:
-            photo_bytes = bytes(photo["file_data"]) if isinstance(photo["file_data"], memoryview) else photo["file_data"]
+            # Plain bytes: the cached fetch already converted the
+            # driver's memoryview once, so no per-rerun copies here.
+            file_data = photo["file_data"]
             
             created_at = photo.get("created_at")
             if created_at:
@@ -1279,13 +1515,20 @@ def render_photo_gallery(photos: list, category: str, project_id: str, drive_fol
             else:
                 caption = photo.get("filename", "Photo")
             
-            st.image(io.BytesIO(photo_bytes), caption=caption, use_container_width=True)
+            # Full-resolution bytes stay server-side for downloads; the
+            # grid ships a small thumbnail instead of base64-embedding
+            # every original JPEG in the page.
+            try:
+                display_bytes = _gallery_thumb(photo["id"], photo.get("created_at"), file_data)
+            except Exception:
+                display_bytes = file_data
+            st.image(io.BytesIO(display_bytes), caption=caption, use_container_width=True)
             
             btn_col1, btn_col2, btn_col3 = st.columns(3)
             with btn_col1:
                 st.download_button(
                     label="📥",
-                    data=photo_bytes,
+                    data=io.BytesIO(file_data),
                     file_name=photo["filename"],
                     mime="image/jpeg",
                     key=f"dl_{category}_{photo['id']}",
@@ -1294,11 +1537,11 @@ def render_photo_gallery(photos: list, category: str, project_id: str, drive_fol
             with btn_col2:
                 if drive_folder_id:
                     if st.button("📦", key=f"arch_{category}_{photo['id']}", use_container_width=True, help="Archive to Drive"):
-                        from views.migration_util import archive_drive_file
                         success, err = archive_drive_file(photo["id"], drive_folder_id)
                         if success:
                             if delete_project_photo(photo["id"]):
                                 st.success("Archived")
+                                _cached_photos_by_categories.clear()
                                 st.rerun()
                         else:
                             st.error(f"Archive failed: {err}")
@@ -1306,13 +1549,28 @@ def render_photo_gallery(photos: list, category: str, project_id: str, drive_fol
                 if st.button("🗑️", key=f"del_{category}_{photo['id']}", use_container_width=True):
                     if delete_project_photo(photo["id"]):
                         st.success("Deleted")
+                        _cached_photos_by_categories.clear()
                         st.rerun()
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _prep_canvas_image(file_bytes: bytes, max_width: int = 700):
+    """Decode and LANCZOS-resize a camera capture for the markup canvas.
+    Cached so slider/selectbox reruns of the markup panel don't repeat the
+    ~100ms resize of a 4K photo."""
+    img = Image.open(io.BytesIO(file_bytes))
+    aspect_ratio = img.height / img.width
+    width = min(img.width, max_width)
+    return img.resize((width, int(width * aspect_ratio)), Image.Resampling.LANCZOS)
+
+
+@st.fragment
 def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gps_coords: str, safe_name: str):
-    """Render the camera markup tool that auto-opens and saves with MT timestamp."""
-    from services.database_manager import save_project_photo
-    
+    """Render the camera markup tool that auto-opens and saves with MT timestamp.
+
+    Runs as a fragment so canvas strokes, mode switches and measurement
+    typing rerun only this panel instead of all of Block A.
+    """
     st.markdown(
         '''
         <style>
@@ -1342,17 +1600,12 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
     )
     
     try:
-        img = Image.open(camera_file)
+        img_resized = _prep_canvas_image(camera_file.getvalue())
     except Exception as e:
         st.error(f"Could not open image: {e}")
         return
     
-    max_width = 700
-    aspect_ratio = img.height / img.width
-    canvas_width = min(img.width, max_width)
-    canvas_height = int(canvas_width * aspect_ratio)
-    
-    img_resized = img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
+    canvas_width, canvas_height = img_resized.size
     
     st.markdown(
         '<p style="color: #FFFFFF; font-size: 14px; margin: 16px 0 8px 0;">🎨 Drawing Tools:</p>',
@@ -1369,13 +1622,13 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
         width_active = st.session_state[active_lane_key] == "width"
         if st.button("🟠 Draw Width", key=f"camera_width_btn_{project_id}", use_container_width=True, type="primary" if width_active else "secondary"):
             st.session_state[active_lane_key] = "width"
-            st.rerun()
+            st.rerun(scope="fragment")
     
     with btn_col2:
         height_active = st.session_state[active_lane_key] == "height"
         if st.button("🟢 Draw Height", key=f"camera_height_btn_{project_id}", use_container_width=True, type="primary" if height_active else "secondary"):
             st.session_state[active_lane_key] = "height"
-            st.rerun()
+            st.rerun(scope="fragment")
     
     if st.session_state[active_lane_key] == "width":
         stroke_color = "#FF8C00"
@@ -1482,10 +1735,7 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
                 draw = ImageDraw.Draw(final_image)
                 
                 if lane1_text.strip():
-                    try:
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-                    except:
-                        font = ImageFont.load_default()
+                    font = _get_watermark_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
                     
                     for dx in [-2, -1, 0, 1, 2]:
                         for dy in [-2, -1, 0, 1, 2]:
@@ -1494,10 +1744,7 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
                     draw.text((20, canvas_height - 60), lane1_text, font=font, fill="#FF8C00")
                 
                 if lane2_text.strip():
-                    try:
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-                    except:
-                        font = ImageFont.load_default()
+                    font = _get_watermark_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
                     
                     for dx in [-2, -1, 0, 1, 2]:
                         for dy in [-2, -1, 0, 1, 2]:
@@ -1508,10 +1755,7 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
                 now = now_mountain()
                 display_time = f"{now.strftime('%b %d, %Y - %I:%M %p')} MT"
                 
-                try:
-                    wm_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 11)
-                except:
-                    wm_font = ImageFont.load_default()
+                wm_font = _get_watermark_font("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 11)
                 
                 watermark_text = display_time
                 if gps_coords:
@@ -1565,6 +1809,7 @@ def render_camera_markup_tool(project_id: str, client_name: str, camera_file, gp
                     st.success(f"✅ Saved: {filename}")
                     st.session_state[f"camera_photo_{project_id}"] = None
                     st.session_state[f"trigger_markup_{project_id}"] = False
+                    _cached_photos_by_categories.clear()
                     st.rerun()
                 else:
                     st.error("Failed to save photo to database")
@@ -2165,10 +2410,10 @@ def render_photo_markup_tool(project_id: str, client_name: str, uploaded_files:
                         st.session_state[f"marked_up_image_{project_id}"] = image_bytes
                         st.session_state[f"marked_up_filename_{project_id}"] = filename
                         
-                        from services.database_manager import save_project_photo
                         if save_project_photo(project_id, filename, image_bytes, "markup"):
                             st.success(f"✅ Markup saved to database: {filename}")
                             st.session_state[f"photos_updated_{project_id}"] = True
+                            _cached_photos_by_categories.clear()
                             st.rerun()
                         else:
                             st.warning(f"⚠️ Saved locally but database save failed: {filename}")
@@ -2212,11 +2457,15 @@ def render_photo_markup_tool(project_id: str, client_name: str, uploaded_files:
         )
 
 
+@st.fragment
 def render_block_b_design_loop(project_id: str, client_name: str, notes: str, google_drive_link: str, design_proof_drive_id: str = "", design_proof_name: str = "", no_design_required: bool = False, status: str = "") -> bool:
     """Block B: The Design Loop - Matt's workflow. Returns True if design is uploaded or not required."""
     from services.database_manager import get_photos_by_categories
     
     has_assigned_design = bool(design_proof_drive_id)
+    # Snapshot before the uploader branch mutates the flag, so a fresh
+    # upload this run is detectable at the bottom of the function.
+    previously_uploaded = bool(st.session_state.get(f"design_uploaded_{project_id}", False))
     
     # Check if status is Design or higher (email already sent)
     status_lower = (status or "").lower().replace(" ", "_").replace("-", "_")
@@ -2250,6 +2499,7 @@ def render_block_b_design_loop(project_id: str, client_name: str, notes: str, go
     
     if current_repair_mode != no_design_required:
         update_no_design_required(project_id, current_repair_mode)
+        _bump_project_version(project_id)
         st.rerun()
     
     if current_repair_mode:
@@ -2267,6 +2517,7 @@ def render_block_b_design_loop(project_id: str, client_name: str, notes: str, go
             ''',
             unsafe_allow_html=True
         )
+        st.session_state[f"design_uploaded_{project_id}"] = True
         return True
     
     if has_assigned_design:
@@ -2406,7 +2657,15 @@ def render_block_b_design_loop(project_id: str, client_name: str, notes: str, go
                     unsafe_allow_html=True
                 )
     
-    return st.session_state[design_key] or (design_file is not None)
+    design_uploaded = st.session_state[design_key] or (design_file is not None)
+    st.session_state[design_key] = design_uploaded
+    if design_file is not None and not previously_uploaded:
+        # A fresh upload lands on a fragment-scope rerun, but Block C was
+        # already rendered locked in the last full pass and only reads the
+        # published flag on a full run — force one so it unlocks now. The
+        # snapshot is true on the follow-up run, so this fires once.
+        st.rerun()
+    return design_uploaded
 
 
 def render_email_voice_button(project_id: str, target_key: str, dialog_type: str):
@@ -2418,7 +2677,6 @@ def render_email_voice_button(project_id: str, target_key: str, dialog_type: str
     - Console logs for debugging
     """
     import streamlit.components.v1 as components
-    from streamlit_js_eval import streamlit_js_eval
     import json
     
     voice_key = f"voice_{dialog_type}_{project_id}"
@@ -2738,6 +2996,7 @@ KB Signs Team"""
             st.rerun()
 
 
+@st.fragment
 def render_block_c_pricing_loop(project_id: str, client_name: str, design_uploaded: bool, google_drive_link: str, proposal_drive_id: str = "", proposal_name: str = ""):
     """Block C: The Pricing Loop - Bruno's workflow. Locked until design is uploaded."""
     
@@ -2952,6 +3211,7 @@ def render_block_c_pricing_loop(project_id: str, client_name: str, design_upload
             )
             
             if success:
+                _bump_project_version(project_id)
                 st.session_state[legacy_sent_key] = True
                 st.success("Project moved to 'Awaiting Customer' status!")
                 st.rerun()
@@ -3160,6 +3420,7 @@ def render_proposal_approval_dialog(project_id: str, to_email: str, client_name:
             st.rerun()
 
 
+@st.fragment
 def render_block_d_deposit_handoff(project_id: str, client_name: str, status: str,
                                     deposit_invoice_requested: bool, deposit_invoice_sent: bool,
                                     deposit_received_date, deposit_amount: float,
@@ -3532,6 +3793,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
             final_deposit = edited_deposit if edited_deposit is not None else 0.0
             
             update_project_estimated_value(project_id, final_total)
+            _bump_project_version(project_id)
             commission_saved = save_commission_amounts(project_id, final_total, final_deposit, notes=commission_notes)
             st.session_state[f"confirmed_total_{project_id}"] = final_total
             st.session_state[f"confirmed_deposit_{project_id}"] = final_deposit
@@ -3560,6 +3822,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                 add_project_note(project_id, "Deposit invoice requested from Bruno via email")
                 add_project_touch(project_id, "email_sent", f"Deposit invoice requested from Bruno ({BRUNO_EMAIL})")
                 update_deposit_stage(project_id, "invoice_requested", True)
+                _bump_project_version(project_id)
                 if is_test_mode():
                     st.success(f"✅ Email sent to Bruno! (Test mode: redirected from {BRUNO_EMAIL})")
                 else:
@@ -3567,6 +3830,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
             else:
                 add_project_note(project_id, f"Email to Bruno failed: {msg}")
                 update_deposit_stage(project_id, "invoice_requested", True)
+                _bump_project_version(project_id)
                 st.warning(f"Request logged, but email failed: {msg}")
             st.rerun()
     
@@ -3582,6 +3846,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                 add_project_note(project_id, "Deposit invoice sent to customer via email")
                 add_project_touch(project_id, "email_sent", f"Deposit invoice sent to customer ({customer_email})")
                 update_deposit_stage(project_id, "invoice_sent", True)
+                _bump_project_version(project_id)
                 if is_test_mode():
                     st.success(f"✅ Invoice sent to customer! (Test mode: redirected from {customer_email})")
                 else:
@@ -3589,6 +3854,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
             else:
                 add_project_note(project_id, f"Email to customer failed: {msg}")
                 update_deposit_stage(project_id, "invoice_sent", True)
+                _bump_project_version(project_id)
                 st.warning(f"Stage updated, but email failed: {msg}")
             st.rerun()
     
@@ -3634,8 +3900,12 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
             unsafe_allow_html=True
         )
         
-        proposals = get_project_proposals(project_id)
-        photos = get_photos_by_categories(project_id)
+        # Independent queries; overlap the two round-trips.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            proposals_future = pool.submit(get_project_proposals, project_id)
+            photos_future = pool.submit(get_photos_by_categories, project_id)
+            proposals = proposals_future.result()
+            photos = photos_future.result()
         all_files = []
         
         for prop in proposals:
@@ -3689,6 +3959,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                     if st.button("🔒 Lock as Master", key=f"lock_master_{project_id}", type="primary"):
                         success = set_master_spec(project_id, selected_file.get("id"), clean_name, client_name)
                         if success:
+                            _bump_project_version(project_id)
                             st.success("✅ Master Spec locked!")
                             st.rerun()
                 elif master_spec_file_id:
@@ -3754,6 +4025,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                         
                         success = set_signed_spec(project_id, save_path, signed_spec_upload.name)
                         if success:
+                            _bump_project_version(project_id)
                             st.success("✅ Signed spec saved!")
                             st.rerun()
                     except Exception as e:
@@ -3776,6 +4048,7 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                 success = mark_deposit_received(project_id, deposit_date, deposit_amt)
                 if success:
                     lock_production(project_id)
+                    _bump_project_version(project_id)
                     add_project_note(project_id, f"Deposit received: ${deposit_amt:,.2f}. Status changed to ACTIVE PRODUCTION.")
                     add_project_touch(project_id, "deposit_received", f"Deposit of ${deposit_amt:,.2f} received. Production started.")
                     st.session_state[f"show_deposit_form_{project_id}"] = False
@@ -3791,14 +4064,18 @@ def render_block_d_deposit_handoff(project_id: str, client_name: str, status: st
                 st.rerun()
 
 
-def render_project_history(project_id: str):
-    """Render project touch history section."""
+def render_project_history(project_id: str, touches: list = None):
+    """Render project touch history section.
+
+    Accepts the touches prefetched with the project bundle; falls back to
+    its own query when called without them."""
     from services.database_manager import get_project_touches
     
     st.markdown("---")
     st.markdown("### 📜 Project History")
     
-    touches = get_project_touches(project_id, limit=15)
+    if touches is None:
+        touches = get_project_touches(project_id, limit=15)
     
     if not touches:
         st.markdown('<p style="color: #888;">No history records yet.</p>', unsafe_allow_html=True)
@@ -3830,6 +4107,7 @@ def render_project_history(project_id: str):
         )
 
 
+@st.fragment
 def render_block_e_production_logistics(project_id: str, client_name: str, status: str, deposit_received_date):
     """Block E: Production & Logistics - Only visible in ACTIVE PRODUCTION status."""
     from services.database_manager import get_production_logistics, save_production_logistics, add_project_touch, get_deposit_received_date
@@ -3962,6 +4240,7 @@ def render_block_e_production_logistics(project_id: str, client_name: str, statu
         st.info(f"⏳ Remaining checks: {', '.join(remaining)}")
 
 
+@st.fragment
 def render_block_f_installation_prep(project_id: str, client_name: str, status: str, google_drive_link: str = None):
     """Block F: The Final Week (Installation Prep) - Activates when Target Installation Date is set."""
     from services.database_manager import get_production_logistics, get_commission_data, add_project_touch, add_project_note, get_primary_contact_email
@@ -4091,6 +4370,7 @@ The customer has been notified and we're all set for tomorrow.
             st.rerun()
 
 
+@st.fragment
 def render_block_g_project_closeout(project_id: str, client_name: str, status: str):
     """Block G: Project Closeout & Final Commission."""
     from services.database_manager import get_commission_data, close_project_with_final_payment, add_project_touch, add_project_note
@@ -4185,6 +4465,7 @@ def render_project_lost_dialog(project_id: str, client_name: str):
         if st.button("❌ Confirm Lost", type="primary", use_container_width=True):
             success = mark_project_lost(project_id, loss_reason)
             if success:
+                _bump_project_version(project_id)
                 st.toast(f"Project marked as Lost", icon="🪦")
                 st.session_state.page = "dashboard"
                 st.rerun()
@@ -4238,6 +4519,7 @@ def render_project_decision(project_id: str, client_name: str, status: str, depo
     if st.button("🏆 Project Won", key=f"mark_won_{project_id}", type="primary", use_container_width=True):
         success = mark_project_won(project_id)
         if success:
+            _bump_project_version(project_id)
             st.toast(f"Project marked as Won!", icon="🏆")
             st.balloons()
             st.session_state.page = "dashboard"